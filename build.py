@@ -10,6 +10,7 @@ Install.run([
     '--windowed',
     f'--add-data={Path("pdoc3_mdnotes/icons/*.png")}{sep}.',
     f'--add-data={Path("pdoc3_mdnotes/templates/*.mako")}{sep}.)',
+    f'--add-data={Path("pdoc3_mdnotes/templates/*.html")}{sep}templates',
     f'--icon={Path("data/mdnotes.ico")}',
     str(Path('pdoc3_mdnotes/').absolute() / 'gui.py'),
 ])
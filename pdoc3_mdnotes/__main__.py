@@ -1,8 +1,9 @@
 """#### Main
 
 Contains `main` function which creates argument parser. According to set flags
-runs program in proper way, e.g. as GUI application or script with passed
-settings. It uses: `argparse`, `importlib` and `pathlib`.
+runs program in proper way, e.g. as GUI application, preview server, watcher
+of changes, builder of many notebooks or script with passed settings. It uses:
+`argparse`, `contextlib`, `importlib`, `json`, `pathlib` and `sys`.
 
 
 #### License
@@ -16,8 +17,11 @@ SOFTWARE.
 """
 
 import argparse
+from contextlib import ExitStack
 import importlib
+import json
 from pathlib import Path
+import sys
 
 from pdoc3_mdnotes import mdnotes
 
@@ -37,11 +41,100 @@ def create_parser():
     parser = argparse.ArgumentParser(
         description=('Make notes from ".md" files. More information under: '
                      'https://ethru.github.io/pdoc3-mdnotes/'))
+    parser.add_argument(
+        '-a', '--atomic',
+        help=('creates notes in sibling staging directory which replaces '
+              'notes directory only when build succeeds'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--assets',
+        help=('saves stylesheets and scripts shared by pages once as files '
+              'named after hash of their content instead of inlining them '
+              'in each page'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '-b', '--batch',
+        help=('path to file listing directories of notebooks, one per line '
+              '(or as list in ".json" file), all of them are created by one '
+              'process, "-" reads them from standard input'),
+        action='store'
+    )
+    parser.add_argument(
+        '-c', '--cache',
+        help=('path to directory where rendered pages are cached, they are '
+              'reused by any build with identical notes and templates'),
+        action='store'
+    )
+    parser.add_argument(
+        '--cache-size',
+        help='maximal size of cache in MiB, default is: 256',
+        action='store',
+        type=int,
+        default=256
+    )
+    parser.add_argument(
+        '--clean',
+        help='deletes pages of notes removed since previous build',
+        action='store_true'
+    )
+    parser.add_argument(
+        '-d', '--define',
+        help=('variable in NAME=VALUE format, each "{{ NAME }}" in notes is '
+              'replaced by its value. Can be used multiple times'),
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '-e', '--exclude',
+        help=('glob pattern of files and directories to skip together with '
+              'their content, e.g. "node_modules/". Can be used multiple '
+              'times. Patterns can be also placed in ".mdnotesignore" file '
+              'inside project directory, one per line'),
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '--explain',
+        help='prints why each page is created',
+        action='store_true'
+    )
+    parser.add_argument(
+        '-f', '--force',
+        help=('create all pages again, by default only pages of notes changed '
+              'since previous build are created'),
+        action='store_true'
+    )
     parser.add_argument(
         '-g', '--gui',
         help='launches GUI for application',
         action='store_true'
     )
+    parser.add_argument(
+        '-i', '--interval',
+        help=('seconds between checks for changes in watch mode, default '
+              'is: 1'),
+        action='store',
+        type=float,
+        default=1.0
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        help=('number of processes rendering pages, default is: 1. When '
+              '0 is passed all available processors are used'),
+        action='store',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--max-size',
+        help=('notes larger than this number of MiB are shown as '
+              'preformatted text instead of being converted, default is: 16'),
+        action='store',
+        type=float,
+        default=16
+    )
     parser.add_argument(
         '-n', '--name',
         help=('name of directory where html notes will be saved, default is: '
@@ -50,6 +143,20 @@ def create_parser():
         action='store',
         default='docs'
     )
+    parser.add_argument(
+        '--output-archive',
+        help=('path to archive where all pages will be streamed instead of '
+              'notes directory, format is chosen by suffix: ".zip", ".tar", '
+              '".tar.gz", ".tar.bz2", ".tar.xz" or ".tar.zst" (needs '
+              '"zstandard" module)'),
+        action='store'
+    )
+    parser.add_argument(
+        '--navigation',
+        help=('saves "navigation.json" file with title, parent and children '
+              'of each page next to html notes'),
+        action='store_true'
+    )
     parser.add_argument(
         '-p', '--path',
         help=('path to directory containing notes (".md" files), when not '
@@ -57,12 +164,107 @@ def create_parser():
         action='store',
         default='.'
     )
+    parser.add_argument(
+        '--port',
+        help='port used by preview server, default is: 8000',
+        action='store',
+        type=int,
+        default=8000
+    )
+    parser.add_argument(
+        '--precompress',
+        help=('saves gzip (and brotli when "brotli" module is installed) '
+              'compressed copy of each written page next to it'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--preprocess',
+        help=('preprocessor changing notes before they are converted: '
+              '"include" (replaces "{!include path!}" with file content), '
+              '"code" (replaces "{!code path!}" with code block of file) or '
+              'callable returning it in "module:attribute" format. Can be '
+              'used multiple times, results are cached'),
+        action='append',
+        default=[]
+    )
+    parser.add_argument(
+        '--preprocess-cache-size',
+        help=('maximal size of cache of preprocessors results in MiB, 0 '
+              'disables it, default is: 64'),
+        action='store',
+        type=int,
+        default=64
+    )
+    parser.add_argument(
+        '--profile',
+        help=('path to file where cProfile statistics of rendering and '
+              'writing pages will be saved, read them with "pstats" module'),
+        action='store'
+    )
+    parser.add_argument(
+        '--progress',
+        help=('displays current build stage, number of saved pages and '
+              'their throughput'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--search',
+        help=('saves full-text search index of notes and "search.html" page '
+              'using it next to html notes'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '-s', '--serve',
+        help=('runs local server which renders notes on demand instead of '
+              'creating them, available under: http://localhost:PORT/'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--sitemap',
+        help=('url under which notes are hosted, when set "sitemap.xml" '
+              'listing all pages is saved next to html notes'),
+        action='store'
+    )
+    parser.add_argument(
+        '--stats',
+        help=('displays table with duration, number of pages, size of read '
+              'and written data and peak memory of each build stage'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--stats-json',
+        help=('path to file where statistics of build stages will be saved '
+              'in json format, "-" prints them'),
+        action='store'
+    )
+    parser.add_argument(
+        '--stream',
+        help=('keeps only structure of notes in memory, content of each note '
+              'is read right before its page is rendered and released once it '
+              'is written, use it for very large notebooks'),
+        action='store_true'
+    )
     parser.add_argument(
         '-t', '--templates',
         help=('path to directory with templates, when not specified directory '
               '"templates" in path where program is run will be used if it '
               'exists else default templates are processed'),
         action='store')
+    parser.add_argument(
+        '-w', '--watch',
+        help=('keeps running after notes are created and creates them again '
+              'when notes or templates change'),
+        action='store_true'
+    )
+    parser.add_argument(
+        '--workers',
+        help=('number of processes creating notebooks listed by `--batch`, '
+              'default is: 1. When 0 is passed all available processors are '
+              'used, each notebook is then rendered by one process'),
+        action='store',
+        type=int,
+        default=1
+    )
     return parser.parse_args()
 
 
@@ -84,6 +286,47 @@ def check_templates(path):
     raise TemplatesError
 
 
+def report(stats, table, path):
+    """Output recorded statistics of build stages.
+
+    Parameters
+    ----------
+    stats : pdoc3_mdnotes.mdnotes.Stats or None
+        recorded statistics, `None` when they were not recorded
+    table : bool
+        information if statistics should be printed as table
+    path : str or None
+        path to file where statistics will be saved as `json`, when it is
+        "-" they are printed
+    """
+    if table:
+        print(stats)
+    if path == '-':
+        print(json.dumps(stats.stages, indent=2))
+    elif path:
+        mdnotes.save(Path(path), json.dumps(stats.stages, indent=2))
+
+
+def show_progress(progress):
+    """Print progress of build in one line of standard error.
+
+    Parameters
+    ----------
+    progress : pdoc3_mdnotes.mdnotes.Progress
+        object reporting current build stage
+    """
+    if progress.url is None:
+        if progress.stage != 'collect':
+            print(file=sys.stderr)
+        line = progress.stage
+        if progress.total:
+            line += f': {progress.total} pages'
+    else:
+        line = (f'{progress.stage}: {progress.done}/{progress.total} pages, '
+                f'{progress.rate:.1f} pages/s')
+    print(f'\r{line:<60}', end='', file=sys.stderr, flush=True)
+
+
 def main():
     """Create argument parser and process its values to run program."""
     args = create_parser()
@@ -97,7 +340,70 @@ def main():
         if templates:
             templates = Path(templates).absolute()
             check_templates(templates)
-        mdnotes.main(path, args.name, templates)
+        cache = None
+        if args.cache:
+            cache = mdnotes.Cache(Path(args.cache).absolute(),
+                                  args.cache_size * 2 ** 20)
+        limit = int(args.max_size * 2 ** 20)
+        preprocessors = [mdnotes.load_preprocessor(name)
+                         for name in args.preprocess]
+        if args.define:
+            values = dict(item.partition('=')[::2] for item in args.define)
+            preprocessors.append(mdnotes.Variables(values))
+        size = args.preprocess_cache_size * 2 ** 20
+        preprocessors = mdnotes.Preprocessing(
+            preprocessors, 'preprocessed' if size else None, size)
+        options = dict(force=args.force, jobs=args.jobs,
+                       exclude=args.exclude, cache=cache,
+                       clean=args.clean, atomic=args.atomic,
+                       stream=args.stream, search=args.search,
+                       precompress=args.precompress, explain=args.explain,
+                       limit=limit, assets=args.assets, sitemap=args.sitemap,
+                       navigation=args.navigation,
+                       preprocessors=preprocessors)
+        if args.serve:
+            serve = importlib.import_module('pdoc3_mdnotes.serve')
+            serve.main(path, args.name, templates, args.port, args.exclude,
+                       preprocessors)
+        elif args.batch:
+            flags = {'--stats': args.stats, '--stats-json': args.stats_json,
+                     '--progress': args.progress, '--profile': args.profile}
+            unsupported = [flag for flag, value in flags.items() if value]
+            if unsupported:
+                raise SystemExit(f'{", ".join(unsupported)} cannot be used '
+                                 f'with --batch')
+            batch = importlib.import_module('pdoc3_mdnotes.batch')
+            batch.main(batch.read_roots(args.batch), args.workers,
+                       name=args.name, templates=templates, **options)
+        elif args.watch:
+            watch = importlib.import_module('pdoc3_mdnotes.watch')
+            watch.main(path, args.name, templates,
+                       interval=args.interval, **options)
+        elif args.output_archive:
+            output = Path(args.output_archive).absolute()
+            with ExitStack() as stack:
+                try:
+                    sink = stack.enter_context(mdnotes.archive(output))
+                except ValueError as error:
+                    raise SystemExit(f'Cannot create {output.name}: {error}')
+                for _ in mdnotes.build(path, sink, templates, args.jobs,
+                                       args.exclude, cache, args.stream,
+                                       limit, args.assets, preprocessors):
+                    pass
+        else:
+            stats = None
+            if args.stats or args.stats_json:
+                stats = mdnotes.Stats()
+            progress = None
+            if args.progress:
+                progress = mdnotes.Progress(show_progress)
+            mdnotes.main(path, args.name, templates, stats=stats,
+                         profile=args.profile, progress=progress, **options)
+            if progress is not None:
+                print(file=sys.stderr)
+            report(stats, args.stats, args.stats_json)
+        if cache is not None:
+            print(cache)
 
 
 if __name__ == '__main__':
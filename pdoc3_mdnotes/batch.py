@@ -0,0 +1,185 @@
+"""#### Batch
+
+Module creates `html` notes of many notebooks in one process, so interpreter
+startup, import of `pdoc` and compilation of templates are paid once instead
+of once per notebook. Template lookups are kept by `pdoc3_mdnotes.mdnotes`
+between builds, so notebooks sharing templates reuse them. Notebooks can be
+also built by pool of worker processes, each of them stays warm for all
+notebooks it builds. Result and duration of each build is reported as soon
+as it finishes. Modules used: `json`, `multiprocessing`, `os`, `pathlib`,
+`sys`, `time` and `pdoc3_mdnotes.mdnotes`.
+
+
+#### License
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import sys
+import time
+
+from pdoc3_mdnotes import mdnotes
+
+COUNTERS = ('hits', 'misses', 'evictions', 'errors')
+"""Names of `pdoc3_mdnotes.mdnotes.Cache` counters summed over workers."""
+
+
+def read_roots(path):
+    """Return paths of notebooks listed in set file.
+
+    File contains one path per line, empty lines and lines starting with "#"
+    are skipped. File with ".json" suffix contains list of paths instead.
+    Relative paths navigate from directory of file.
+
+    Parameters
+    ----------
+    path : str
+        path to file with notebooks, "-" reads them from standard input
+
+    Returns
+    -------
+    list
+        absolute paths (`pathlib.Path`) of notebooks directories
+    """
+    if path == '-':
+        content, base = sys.stdin.read(), Path()
+    else:
+        content, base = mdnotes.load(Path(path)), Path(path).parent
+    if path.endswith('.json'):
+        lines = json.loads(content)
+    else:
+        lines = [line.strip() for line in content.splitlines()]
+        lines = [line for line in lines if line and not line.startswith('#')]
+    return [(base / line).absolute() for line in lines]
+
+
+def _warm():
+    """Import `pdoc` in worker process before first notebook is built."""
+    mdnotes.note_class()
+
+
+def build(root, options):
+    """Create `html` notes of one notebook.
+
+    Parameters
+    ----------
+    root : pathlib.Path
+        path to directory with notes
+    options : dict
+        keyword arguments passed to `pdoc3_mdnotes.mdnotes.main`
+
+    Returns
+    -------
+    tuple
+        containing path of notebook, error message (`None` when build
+        succeeded) and duration of build in seconds
+    """
+    start = time.perf_counter()
+    try:
+        mdnotes.main(root, **options)
+    except Exception as error:
+        message = str(error) or type(error).__name__
+    else:
+        message = None
+    return root, message, time.perf_counter() - start
+
+
+def _counters(cache):
+    """Return counters of cache, zeros when it is `None`."""
+    return [getattr(cache, name, 0) for name in COUNTERS]
+
+
+def _build(arguments):
+    """Return result of `build` in worker process and change of counters.
+
+    Worker uses its own copy of cache, so counters it changed are sent back
+    to parent process together with result of build.
+    """
+    root, options = arguments
+    before = _counters(options['cache'])
+    result = build(root, options)
+    after = _counters(options['cache'])
+    return result, [new - old for new, old in zip(after, before)]
+
+
+def run(roots, workers=1, **options):
+    """Create `html` notes of set notebooks.
+
+    With more than one worker notebooks are built by `multiprocessing.Pool`
+    and each of them renders its pages in one process, so `jobs` option is
+    ignored. Counters of `cache` option changed by worker processes are
+    added to it in parent process. Failure of one notebook does not stop
+    others.
+
+    Parameters
+    ----------
+    roots : list
+        paths (`pathlib.Path`) of directories with notes
+    workers : int, optional
+        number of processes building notebooks, all available processors
+        are used when lower than 1 (default is 1)
+    **options
+        keyword arguments passed to `pdoc3_mdnotes.mdnotes.main`
+
+    Yields
+    ------
+    tuple
+        result of `build` for each notebook in order of completion
+    """
+    workers = min(workers if workers > 0 else os.cpu_count() or 1,
+                  len(roots))
+    if workers <= 1:
+        for root in roots:
+            yield build(root, options)
+        return
+
+    options = dict(options, jobs=1, cache=options.get('cache'))
+    with multiprocessing.Pool(workers, _warm) as pool:
+        arguments = [(root, options) for root in roots]
+        for result, changes in pool.imap_unordered(_build, arguments):
+            if options['cache'] is not None:
+                for name, change in zip(COUNTERS, changes):
+                    setattr(options['cache'], name,
+                            getattr(options['cache'], name) + change)
+            yield result
+
+
+def main(roots, workers=1, **options):
+    """Create `html` notes of set notebooks and report result of each build.
+
+    Parameters
+    ----------
+    roots : list
+        paths (`pathlib.Path`) of directories with notes
+    workers : int, optional
+        number of processes building notebooks (default is 1)
+    **options
+        keyword arguments passed to `pdoc3_mdnotes.mdnotes.main`
+
+    Raises
+    ------
+    SystemExit
+        if any notebook could not be built
+    """
+    start = time.perf_counter()
+    failed = 0
+    for root, error, elapsed in run(roots, workers, **options):
+        if error is None:
+            print(f'{elapsed:8.2f}s  {root}', flush=True)
+        else:
+            failed += 1
+            print(f'{elapsed:8.2f}s  {root}  FAILED: {error}', flush=True)
+    elapsed = time.perf_counter() - start
+    print(f'Built {len(roots) - failed} of {len(roots)} notebooks in '
+          f'{elapsed:.2f}s', flush=True)
+    if failed:
+        raise SystemExit(f'{failed} notebooks failed')
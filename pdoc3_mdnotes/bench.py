@@ -0,0 +1,266 @@
+"""#### Bench
+
+Module measures speed of notes creation. It generates synthetic notebook of
+set width, depth and page size in temporary directory, then times each stage
+of build separately: collecting files (`Converter.collect`), converting them
+to linked module tree (`Converter.convert` called by `Notes.__init__`),
+rendering pages (`Notes.render`) and writing them to disk. Startup of command
+line interface is timed in fresh interpreter too: importing `mdnotes`,
+printing help and build with nothing to do. Results are printed as `json`, so
+they can be saved and compared between versions. Run it with
+`python -m pdoc3_mdnotes.bench --help` to see available options. Modules
+used: `argparse`, `json`, `pathlib`, `platform`, `statistics`, `subprocess`,
+`sys`, `tempfile`, `time`, `pdoc` and `pdoc3_mdnotes`.
+
+
+#### License
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+import pdoc
+
+from pdoc3_mdnotes import __version__, mdnotes
+
+PARAGRAPH = (
+    '## Section {index}\n\n'
+    'Paragraph with *emphasis*, **strong text**, `inline code` and a '
+    '[link](https://pdoc3.github.io/pdoc/) repeated to reach page size.\n\n'
+    '- first item\n- second item\n- third item\n\n'
+    '```python\ndef section_{index}():\n    return {index}\n```\n\n'
+)
+
+
+def create_note(path, size):
+    """Save note with Markdown content of at least set size in bytes.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path where note will be saved
+    size : int
+        minimal size of note content in bytes
+    """
+    parts = [f'# {path.stem.title()}\n\n']
+    index = 0
+    while sum(map(len, parts)) < size:
+        parts.append(PARAGRAPH.format(index=index))
+        index += 1
+    mdnotes.save(path, ''.join(parts))
+
+
+def create_tree(path, width, depth, size):
+    """Create synthetic notebook in set directory.
+
+    Each directory contains `README.md` and `width` notes. Until `depth` is
+    reached it also contains `width` subdirectories with the same structure.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory where notebook will be created
+    width : int
+        number of notes and subdirectories in each directory
+    depth : int
+        number of nested directory levels
+    size : int
+        minimal size of each note in bytes
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    create_note(path / 'README.md', size)
+    for index in range(width):
+        create_note(path / f'note_{index}.md', size)
+        if depth > 0:
+            create_tree(path / f'topic_{index}', width, depth - 1, size)
+
+
+def measure(path, jobs):
+    """Create notes from set directory once timing each stage.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    jobs : int
+        number of processes rendering pages
+
+    Returns
+    -------
+    dict
+        stage name mapped to its duration in seconds
+    """
+    times = {}
+    start = time.perf_counter()
+    converter = mdnotes.Converter(path)
+    times['collect'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    notes = mdnotes.Notes(converter)
+    times['convert'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages = list(notes.render(jobs=jobs))
+    times['render'] = time.perf_counter() - start
+
+    with TemporaryDirectory() as output:
+        start = time.perf_counter()
+        for url, content in pages:
+            mdnotes.write(Path(output) / notes.relative(url), content)
+        times['write'] = time.perf_counter() - start
+    return times
+
+
+def measure_startup(path):
+    """Time commands run in fresh interpreter once.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory with notes which were already created
+
+    Returns
+    -------
+    dict
+        command name mapped to its duration in seconds
+    """
+    commands = {
+        'import': ['-c', 'import pdoc3_mdnotes.mdnotes'],
+        'help': ['-m', 'pdoc3_mdnotes', '--help'],
+        'noop': ['-m', 'pdoc3_mdnotes', '-p', str(path)],
+    }
+    times = {}
+    for name, arguments in commands.items():
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], check=True,
+                       stdout=subprocess.DEVNULL)
+        times[name] = time.perf_counter() - start
+    return times
+
+
+def summarize(samples):
+    """Return minimal, median and maximal value of each measured stage.
+
+    Parameters
+    ----------
+    samples : list
+        dicts with stage name mapped to its duration in seconds
+
+    Returns
+    -------
+    dict
+        stage name mapped to dict with its `min`, `median` and `max` duration
+    """
+    stages = {}
+    for stage in samples[0]:
+        values = [sample[stage] for sample in samples]
+        stages[stage] = {'min': min(values),
+                         'median': statistics.median(values),
+                         'max': max(values)}
+    return stages
+
+
+def run(width=5, depth=2, size=4096, repeat=3, jobs=1):
+    """Generate notebook and measure its creation set number of times.
+
+    Parameters
+    ----------
+    width : int, optional
+        number of notes and subdirectories in each directory (default is 5)
+    depth : int, optional
+        number of nested directory levels (default is 2)
+    size : int, optional
+        minimal size of each note in bytes (default is 4096)
+    repeat : int, optional
+        number of measurements of each stage (default is 3)
+    jobs : int, optional
+        number of processes rendering pages (default is 1)
+
+    Returns
+    -------
+    dict
+        information about environment, notebook and minimal, median and
+        maximal duration of each stage and startup command in seconds
+    """
+    with TemporaryDirectory() as temp:
+        path = Path(temp) / 'notebook'
+        create_tree(path, width, depth, size)
+        files = mdnotes.Converter(path).files
+        samples = [measure(path, jobs) for _ in range(repeat)]
+        mdnotes.main(path)
+        startup = [measure_startup(path) for _ in range(repeat)]
+
+    stages = summarize(samples)
+    return {
+        'version': __version__,
+        'pdoc': pdoc.__version__,
+        'python': platform.python_version(),
+        'parameters': {'width': width, 'depth': depth, 'size': size,
+                       'repeat': repeat, 'jobs': jobs},
+        'notes': len(files),
+        'stages': stages,
+        'total': sum(stage['median'] for stage in stages.values()),
+        'startup': summarize(startup),
+    }
+
+
+def create_parser():
+    """Create parser then return its arguments."""
+    parser = argparse.ArgumentParser(
+        description=('Measure speed of each stage of notes creation on '
+                     'synthetic notebook. Results are printed as json.'))
+    parser.add_argument(
+        '-d', '--depth',
+        help='number of nested directory levels, default is: 2',
+        action='store', type=int, default=2)
+    parser.add_argument(
+        '-j', '--jobs',
+        help='number of processes rendering pages, default is: 1',
+        action='store', type=int, default=1)
+    parser.add_argument(
+        '-o', '--output',
+        help='path to file where results will be saved instead of printed',
+        action='store')
+    parser.add_argument(
+        '-r', '--repeat',
+        help='number of measurements of each stage, default is: 3',
+        action='store', type=int, default=3)
+    parser.add_argument(
+        '-s', '--size',
+        help='minimal size of each note in bytes, default is: 4096',
+        action='store', type=int, default=4096)
+    parser.add_argument(
+        '-w', '--width',
+        help=('number of notes and subdirectories in each directory, '
+              'default is: 5'),
+        action='store', type=int, default=5)
+    return parser.parse_args()
+
+
+def main():
+    """Run benchmark with parsed arguments and output its results."""
+    args = create_parser()
+    results = run(args.width, args.depth, args.size, args.repeat, args.jobs)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        mdnotes.save(Path(args.output), output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
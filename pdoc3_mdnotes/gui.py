@@ -1,11 +1,14 @@
 """#### GUI
 
-Module gathers classes and methods necessary to create GUI. Its divided for two
-blocks `Directory` and `Buttons` both extending `tkinter.Frame`. `Directory`
-holds label, path entry and browse button. In `Buttons` frame there are bottom
-buttons with their functions. `Gui` connects each part and places them in main
-window which will be displayed. Modules used: `pathlib`, `sys`, `tkinter` with
-`filedialog`, `messagebox` and `webbrowser`.
+Module gathers classes and methods necessary to create GUI. Its divided for
+three blocks `Directory`, `Status` and `Buttons` all extending `tkinter.Frame`.
+`Directory` holds label, path entry and browse button. `Status` shows progress
+bar with throughput of build. In `Buttons` frame there are bottom buttons with
+their functions. Notes are created by background thread which sends progress
+events through queue, so window stays responsive and build can be cancelled.
+`Gui` connects each part and places them in main window which will be
+displayed. Modules used: `pathlib`, `queue`, `sys`, `threading`, `tkinter`
+with `filedialog`, `messagebox`, `ttk` and `webbrowser`.
 
 
 #### License
@@ -19,10 +22,13 @@ SOFTWARE.
 """
 
 from pathlib import Path
+import queue
 import sys
+import threading
 import tkinter as tk
 from tkinter.filedialog import askdirectory
 import tkinter.messagebox as msg
+from tkinter import ttk
 import webbrowser
 
 from pdoc3_mdnotes import mdnotes
@@ -38,6 +44,8 @@ class Gui(tk.Tk):
     ----------
     directory : Directory
         used for communication with `Directory` widget
+    status : Status
+        used for communication with `Status` widget
     """
 
     def __init__(self, title, size):
@@ -59,8 +67,10 @@ class Gui(tk.Tk):
 
         self.directory = Directory(self)
         self.directory.grid(row=0, column=0, padx=20, pady=25)
+        self.status = Status(self)
+        self.status.grid(row=1, column=0, padx=20, sticky='WE')
         buttons = Buttons(self)
-        buttons.grid(row=1, column=0, padx=10, pady=15, sticky='SE')
+        buttons.grid(row=2, column=0, padx=10, pady=15, sticky='SE')
 
         self.bind('<Return>', buttons.create_notes)
         self.bind('<Escape>', sys.exit)
@@ -135,12 +145,76 @@ class Directory(tk.Frame):
         self.variable.set(askdirectory(initialdir=self.home))
 
 
+class Status(tk.Frame):
+    """
+    Create status widget showing progress of build. It extends `tk.Frame`.
+
+    ...
+
+    Attributes
+    ----------
+    bar : ttk.Progressbar
+        bar filled with number of saved pages
+    variable : tk.StringVar
+        stores description of build stage and its throughput
+    """
+
+    def __init__(self, menu):
+        """Place status widget elements.
+
+        Parameters
+        ----------
+        menu : Gui
+            container where `Status` widget will be bound
+        """
+        super().__init__(menu)
+        self.columnconfigure(0, weight=1)
+        self.bar = ttk.Progressbar(self, mode='determinate')
+        self.bar.grid(row=0, column=0, sticky='WE')
+        self.variable = tk.StringVar(self)
+        tk.Label(self, textvariable=self.variable, width=24, anchor='e',
+                 font='none 9').grid(row=0, column=1, padx=5)
+
+    def show(self, stage, done, total, rate):
+        """Display progress of build stage.
+
+        Parameters
+        ----------
+        stage : str
+            name of build stage
+        done : int
+            number of pages already saved in stage
+        total : int
+            number of pages saved in stage, 0 when it is unknown
+        rate : float
+            number of pages saved per second
+        """
+        self.bar.configure(maximum=max(total, 1), value=done)
+        if done:
+            self.variable.set(f'{done}/{total} pages, {rate:.1f}/s')
+        else:
+            self.variable.set(stage.capitalize())
+
+
 class Buttons(tk.Frame):
     """
     Create buttons widget. It extends `tk.Frame`.
 
     ...
 
+    Attributes
+    ----------
+    submit : tk.Button
+        button starting build, disabled while build is running
+    cancel : tk.Button
+        button stopping build, enabled only while build is running
+    status : Status
+        widget showing progress of build
+    events : queue.Queue
+        events sent by build thread, read by `self.poll` in GUI thread
+    progress : pdoc3_mdnotes.mdnotes.Progress or None
+        object reporting progress of running build, `None` when idle
+
     Methods
     -------
     get_path
@@ -156,32 +230,113 @@ class Buttons(tk.Frame):
             container where `Buttons` widget will be bound
         """
         super().__init__(menu)
-        tk.Button(self, text='Submit', width=7,
-                  command=self.create_notes).grid(row=0, column=0)
+        self.submit = tk.Button(self, text='Submit', width=7,
+                                command=self.create_notes)
+        self.submit.grid(row=0, column=0)
+        self.cancel = tk.Button(self, text='Cancel', width=7,
+                                command=self.cancel_notes, state='disabled')
+        self.cancel.grid(row=0, column=1)
         tk.Button(self, text='About', width=7,
-                  command=self.open_homepage).grid(row=0, column=1)
+                  command=self.open_homepage).grid(row=0, column=2)
         self.get_path = menu.directory.variable.get
+        self.status = menu.status
+        self.events = queue.Queue()
+        self.progress = None
 
     def create_notes(self, *_):
-        """Make `html` notes.
+        """Start creating `html` notes in background thread.
 
         If path from application entry is correct it creates `html` notes with
-        `pdoc3_mdnotes.mdnotes.main` function. In case of error appropriate
-        notification is displayed.
+        `pdoc3_mdnotes.mdnotes.main` function run by `self.build` thread.
+        Cancelled build stops between pages, each written page is complete
+        and manifest is not saved, so next build creates remaining ones. In
+        case of error appropriate notification is displayed.
+        """
+        if self.progress is not None:
+            return
+        path = Path(self.get_path())
+        if not path.is_absolute() or not path.is_dir():
+            self.show_path_error()
+            return
+        self.progress = mdnotes.Progress(self.send)
+        self.submit.configure(state='disabled')
+        self.cancel.configure(state='normal')
+        threading.Thread(target=self.build, args=(path, self.progress),
+                         daemon=True).start()
+        self.poll()
+
+    def cancel_notes(self):
+        """Stop running build at its next progress event."""
+        if self.progress is not None:
+            self.progress.cancel()
+            self.cancel.configure(state='disabled')
+            self.status.variable.set('Cancelling...')
+
+    def build(self, path, progress):
+        """Create `html` notes then send result, it is run by build thread.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            path to directory with notes
+        progress : pdoc3_mdnotes.mdnotes.Progress
+            object reporting progress of build
         """
         try:
-            path = Path(self.get_path())
-            if not path.is_absolute():
-                raise AttributeError
-            mdnotes.main(path)
+            mdnotes.main(path, progress=progress)
+        except Exception as error:
+            self.events.put(('error', error))
+        else:
+            self.events.put(('done', None))
+
+    def send(self, progress):
+        """Put progress event to queue, it is called by build thread.
+
+        Parameters
+        ----------
+        progress : pdoc3_mdnotes.mdnotes.Progress
+            object reporting progress of build
+        """
+        self.events.put(('progress', (progress.stage, progress.done,
+                                      progress.total, progress.rate)))
+
+    def poll(self):
+        """Show events sent by build thread and handle its result."""
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                self.after(100, self.poll)
+                return
+            if kind == 'progress':
+                self.status.show(*value)
+            else:
+                break
+
+        self.progress = None
+        self.submit.configure(state='normal')
+        self.cancel.configure(state='disabled')
+        if kind == 'done':
             msg.showinfo('Success',
                          'Notes created in set directory. Exiting...')
             sys.exit()
-        except mdnotes.ACCESS_ERRORS:
-            msg.showerror('Error',
-                          ('Wrong path. It must be a directory with write '
-                           'permission. Use absolute path only, e.g. Windows: '
-                           r'"C:\Desktop\Files", Linux: "/home/user/Files".'))
+        self.status.bar.configure(value=0)
+        if isinstance(value, mdnotes.Cancelled):
+            self.status.variable.set('Cancelled')
+        elif isinstance(value, mdnotes.ACCESS_ERRORS):
+            self.status.variable.set('')
+            self.show_path_error()
+        else:
+            self.status.variable.set('')
+            msg.showerror('Error', f'Notes could not be created: {value}')
+
+    @staticmethod
+    def show_path_error():
+        """Display notification about wrong path."""
+        msg.showerror('Error',
+                      ('Wrong path. It must be a directory with write '
+                       'permission. Use absolute path only, e.g. Windows: '
+                       r'"C:\Desktop\Files", Linux: "/home/user/Files".'))
 
     @staticmethod
     def open_homepage():
@@ -192,7 +347,7 @@ class Buttons(tk.Frame):
 def main():
     """Adjust GUI width according to used platform then create it."""
     width = '400' if sys.platform == 'win32' else '460'
-    Gui('pdoc3-mdnotes', f'{width}x130').mainloop()
+    Gui('pdoc3-mdnotes', f'{width}x160').mainloop()
 
 
 if __name__ == '__main__':
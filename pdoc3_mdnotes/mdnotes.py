@@ -4,11 +4,33 @@
 Contains all necessary functions, classes and methods to use extension. It can
 be run as standalone script. Then `html` notes will be created from files
 placed in script directory ('templates' folder can be also added there for
-customization). `main` function creates `tempfile.TemporaryDirectory` and
-places there `.md` files content enclosed with docstring converted to `.py`.
-Directory structure is preserved. All `README.md` are renamed to `__init__.py`
-which helps build `index.html` page for each folder with notes. Modules used:
-`os`, `pathlib`, `sys`, `tempfile` and `pdoc`.
+customization). `main` function converts content of `.md` files directly to
+`Note` objects (`pdoc.Module` built in memory, no files are written or
+imported). Directory structure is preserved. Each `README.md` becomes
+docstring of its directory which helps build `index.html` page for each folder
+with notes. `Manifest` saved next to `html` notes allows to create again only
+pages of modified notes. Pages can be rendered in parallel by pool of worker
+processes. Rendered pages can be reused between builds thanks to `Cache`.
+Pages are written only when their content changes, optionally whole build is
+staged in sibling directory and swapped in when it succeeds. Files and
+directories matching patterns from `.mdnotesignore` are skipped. `Stats` can
+record duration and size of each build stage. Compiled templates are cached
+in user cache directory. `Index` saves prebuilt full-text search index with
+search page. `Compressor` saves compressed copies of pages. `build` creates
+pages without writing them, passing them to set sink, e.g. `archive`. Notes
+above size limit are shown as preformatted text, they are hashed and written
+in chunks, so they are never held in memory as a whole.
+`Progress` reports each build stage and saved page, it can cancel build.
+`Assets` moves stylesheets and scripts shared by pages to hashed files.
+Navigation of all pages is computed once and can be saved with sitemap.
+`Preprocessor` plugins change notes before conversion, see `Preprocessing`.
+Modules used: `ast`, `brotli` (optional), `codecs`, `collections`,
+`concurrent.futures`, `contextlib`, `cProfile`, `fnmatch`, `gzip`, `hashlib`,
+`html`, `importlib`, `inspect`, `io`, `json`, `mako`, `multiprocessing`,
+`os`, `pathlib`, `re`, `resource` (optional), `shutil`, `sys`, `tarfile`,
+`tempfile`, `threading`, `time`, `types`, `urllib`, `warnings`, `xml`,
+`zipfile`, `zstandard` (optional) and `pdoc`. Heavy ones are imported only
+when pages are rendered.
 
 
 #### License
@@ -25,15 +47,56 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from fnmatch import fnmatch
+import hashlib
+import importlib.util
+import json
+import os
 from pathlib import Path
+import re
+import shutil
 import sys
-from tempfile import TemporaryDirectory
+import time
+import warnings
 
-import pdoc
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 ACCESS_ERRORS = (AttributeError, FileNotFoundError,
                  NotADirectoryError, PermissionError)
 
+CACHE = Path(os.environ.get("XDG_CACHE_HOME",
+                           Path.home() / ".cache")) / "pdoc3-mdnotes"
+"""Directory where compiled templates are stored."""
+
+IGNORE = ".mdnotesignore"
+"""Name of file with patterns of paths skipped by `Converter`."""
+
+LIMIT = 16 * 2 ** 20
+"""Size in bytes above which note is shown as preformatted text."""
+
+QUEUE = 2
+"""Maximal number of items processed by `pipeline` ahead of its consumer."""
+
+THREADS = 8
+"""Number of threads reading or writing files in `pipeline`."""
+
+_notes = None
+"""`Notes` object used by worker processes to render pages."""
+
+_lookups = {}
+"""Templates directory mapped to lookup using it, `None` to `pdoc` default."""
+
+_configs = {}
+"""Compiled `config.mako` template mapped to configuration it defines."""
+
+_found = {}
+"""Arguments of `find_templates` mapped to state of candidates and result."""
+
 
 def load(path: Path) -> str:
     """Return file content from set path."""
@@ -41,253 +104,2991 @@ def load(path: Path) -> str:
         return data.read()
 
 
-def save(path: Path, content: str):
-    """Save passed content to file located in set path."""
-    with open(path, "w") as data:
-        data.write(content)
+def load_hash(path: Path) -> str:
+    """Return hash of file content read in chunks, not held in memory."""
+    data = hashlib.sha1()
+    for chunk in load_chunks(path):
+        data.update(chunk)
+    return data.hexdigest()
+
+
+def load_chunks(path: Path, size=2 ** 20):
+    """Yield file content in chunks of set size."""
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(size), b""):
+            yield chunk
+
+
+def load_html(path: Path, size=2 ** 20):
+    """Yield file content as escaped preformatted `html` block in chunks.
+
+    File is read and escaped in chunks of set size, so only one chunk of
+    file is held in memory at once.
+    """
+    import codecs
+    import html
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    yield "<pre>"
+    for chunk in load_chunks(path, size):
+        yield html.escape(decoder.decode(chunk), quote=False)
+    yield html.escape(decoder.decode(b"", final=True), quote=False)
+    yield "</pre>"
+
+
+def save(path: Path, content: str):
+    """Save passed content to file located in set path."""
+    with open(path, "w") as data:
+        data.write(content)
+
+
+def write(path: Path, content) -> int:
+    """Save passed content to file in set path unless it already holds it.
+
+    Content is written to temporary file which then replaces original one,
+    so file is never left incomplete and its other hard links stay intact.
+    Content other than `str` or `bytes` is iterable of `bytes` chunks, it is
+    streamed to temporary file and compared with original one by size and
+    hash, so it is never held in memory as a whole.
+
+    Returns
+    -------
+    int
+        number of written bytes, 0 when file was not written
+    """
+    if not isinstance(content, (str, bytes)):
+        return write_chunks(path, content)
+    data = content if isinstance(content, bytes) else content.encode()
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return 0
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, "wb") as file:
+            file.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+    return len(data)
+
+
+def write_chunks(path: Path, chunks) -> int:
+    """Stream chunks to file in set path unless it already holds them."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    data = hashlib.sha1()
+    size = 0
+    try:
+        with open(temp, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                data.update(chunk)
+                size += len(chunk)
+        if path.exists() and path.stat().st_size == size:
+            existing = hashlib.sha1()
+            for chunk in load_chunks(path):
+                existing.update(chunk)
+            if existing.digest() == data.digest():
+                os.unlink(temp)
+                return 0
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+    return size
+
+
+def link(source, destination):
+    """Hard link file from source to destination, copy it when impossible."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+@contextmanager
+def staged(directory: Path):
+    """Yield sibling of set directory which replaces it at exit.
+
+    Staging directory starts as copy of set directory made of hard links, so
+    preparing it is cheap and unchanged files keep their metadata. When block
+    finishes successfully directories are swapped with two renames, there is
+    short window between them when set directory does not exist. In case of
+    error staging directory is removed and set one stays untouched.
+    """
+    staging = directory.with_name(f".{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    if directory.is_dir():
+        shutil.copytree(directory, staging, copy_function=link)
+    else:
+        staging.mkdir(parents=True)
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    backup = staging.with_suffix(".old")
+    if directory.exists():
+        os.replace(directory, backup)
+    os.replace(staging, directory)
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+def hash_templates(directories) -> str:
+    """Return hash of templates from set directories and `pdoc` version."""
+    import pdoc
+
+    data = hashlib.sha1(pdoc.__version__.encode())
+    for directory in directories:
+        for path in sorted(Path(directory).glob("*.mako")):
+            data.update(path.name.encode())
+            data.update(path.read_bytes())
+    return data.hexdigest()
+
+
+def create_lookup(directory: Path):
+    """Return templates lookup for set directory with compiled templates cache.
+
+    Compiled templates are stored in `CACHE` under hash of templates and
+    `mako` version, so each templates set is compiled once and later builds
+    only import it. Templates precompiled during installation (`compiled`
+    directory next to them) are copied there when cache is empty. When cache
+    is not writable templates are compiled in memory.
+    """
+    from mako.lookup import TemplateLookup
+    import mako
+
+    key = digest(hash_templates([directory]) + mako.__version__)
+    compiled = CACHE / "templates" / key
+    precompiled = directory / "compiled"
+    try:
+        if precompiled.is_dir() and not compiled.is_dir():
+            shutil.copytree(precompiled, compiled, copy_function=shutil.copy)
+        compiled.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        compiled = None
+    return TemplateLookup(directories=[str(directory)],
+                          module_directory=compiled and str(compiled),
+                          cache_args=dict(cached=True, cache_type="memory"),
+                          input_encoding="utf-8")
+
+
+def find_templates(directory, destination):
+    """Return first directory containing templates or `None`.
+
+    Passed directory is checked first, then folder `templates` in
+    `destination` and finally templates from installation directory. Result
+    is remembered and candidates are listed again only when modification
+    time of any of them changes, so each build checks them once.
+
+    Parameters
+    ----------
+    directory : pathlib.Path or None
+        path to directory containing templates, `None` when not specified
+    destination : pathlib.Path
+        path to project directory
+
+    Returns
+    -------
+    pathlib.Path or None
+        path to found templates, `None` when `pdoc` ones should be used
+    """
+    module_dir = getattr(sys, "_MEIPASS", Path(__file__).parent.absolute())
+    module = Path(module_dir) / "templates"
+    candidates = [path for path in (directory, destination / "templates",
+                                    module) if path is not None]
+    state = []
+    for path in candidates:
+        try:
+            state.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            state.append(None)
+    key = (directory, destination)
+    if key in _found and _found[key][0] == state:
+        return _found[key][1]
+    found = next(filter(Notes.has_templates, candidates), None)
+    _found[key] = (state, found)
+    return found
+
+
+def search_page() -> str:
+    """Return page searching notes with index saved by `Index`.
+
+    Page is shipped as package data next to templates from installation
+    directory.
+    """
+    module_dir = getattr(sys, "_MEIPASS", Path(__file__).parent.absolute())
+    return load(Path(module_dir) / "templates" / Index.PAGE)
+
+
+def fingerprint(paths, templates=None, options=None) -> str:
+    """Return hash of location, modification time and size of build inputs.
+
+    Besides set paths templates and installed `pdoc` and `mako` packages are
+    taken into account, found without importing them. Fingerprint is cheap
+    to compute, but valid only on machine where it was created.
+
+    Parameters
+    ----------
+    paths : iterable
+        paths to notes
+    templates : pathlib.Path or None, optional
+        path to directory with used templates, `None` when `pdoc` ones are
+        used (default is `None`)
+    options : dict or None, optional
+        build options changing its output (default is `None`)
+
+    Returns
+    -------
+    str
+        hash of state of all files build depends on
+    """
+    packages = []
+    for name in ("pdoc", "mako"):
+        spec = importlib.util.find_spec(name)
+        packages.append(spec and spec.origin)
+    if templates is None and packages[0]:
+        templates = Path(packages[0]).parent / "templates"
+    if templates is not None:
+        packages.extend(sorted(Path(templates).glob("*.mako")))
+
+    data = hashlib.sha1(json.dumps(options, sort_keys=True).encode())
+    for path in [*sorted(paths), *packages]:
+        try:
+            stat = os.stat(path)
+            data.update(f"{path} {stat.st_mtime_ns} {stat.st_size}\n".encode())
+        except (OSError, TypeError):
+            data.update(f"{path}\n".encode())
+    return data.hexdigest()
+
+
+def digest(content: str) -> str:
+    """Return hash of passed content."""
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def ancestors(name: str):
+    """Yield names of all parent modules of module with set name."""
+    parts = name.split(".")[:-1]
+    while parts:
+        yield ".".join(parts)
+        parts.pop()
+
+
+def pipeline(function, items, threads=THREADS, size=QUEUE):
+    """Apply function to items in worker threads and yield results in order.
+
+    It is stage of producer/consumer pipeline: items are taken from previous
+    stage (e.g. generator) only when there is place in bounded queue, so
+    stages overlap while memory stays limited. Meant for I/O bound functions
+    which release GIL.
+
+    Parameters
+    ----------
+    function : callable
+        function called with each item
+    items : iterable
+        items passed to function
+    threads : int, optional
+        number of worker threads, no more than `size` are used (default is
+        `THREADS`)
+    size : int, optional
+        maximal number of items processed or waiting for consumer, it bounds
+        memory held by stage (default is `QUEUE`)
+
+    Yields
+    ------
+    object
+        result of function for each item, in order of items
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(min(threads, size)) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= size:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def identifiers(content: str) -> set:
+    """Return names in inline code of passed content which `pdoc` can link.
+
+    Fenced code blocks are skipped, `pdoc` does not link names inside them.
+    """
+    content = re.sub(r"^ *(`{3,}|~{3,}).*?^ *\1", "", content,
+                     flags=re.MULTILINE | re.DOTALL)
+    names = set()
+    for _, span in re.findall(r"(`+)(.+?)\1", content, re.DOTALL):
+        names.update(re.findall(r"[a-zA-Z_]\w*(?:\.[a-zA-Z_]\w*)*", span))
+    return names
+
+
+def included(content: str, path: Path) -> list:
+    """Return paths to files included by `.. include::` in passed content.
+
+    `pdoc` expands these directives while creating module, relative to
+    directory of note located in `path`. It does that twice, so directives in
+    included files are found too.
+    """
+    paths = []
+    for _ in range(2):
+        found = re.findall(r"^ *\.\. ?include:: *(.+?) *$", content,
+                           re.MULTILINE)
+        found = [Path(os.path.normpath(path.parent / f)) for f in found]
+        content = "\n".join(load(p) for p in found if p.is_file())
+        paths.extend(p for p in found if p not in paths)
+    return paths
+
+
+class Preformatted:
+    """
+    Page showing file as preformatted text, its content is streamed.
+
+    Page is not held in memory, `chunks` yields its head, escaped file
+    content and tail one by one, so it can be passed to `write`.
+
+    ...
+
+    Attributes
+    ----------
+    head : str
+        `html` content of page before file content
+    path : str
+        path to file shown on page
+    tail : str
+        `html` content of page after file content
+    """
+
+    def __init__(self, head, path, tail):
+        """Set parts of page."""
+        self.head = head
+        self.path = path
+        self.tail = tail
+
+    def __iter__(self):
+        """Return iterator of encoded chunks of page, see `chunks`."""
+        return self.chunks()
+
+    def __str__(self):
+        """Return whole page, it is held in memory."""
+        return "".join([self.head, *load_html(self.path), self.tail])
+
+    def chunks(self):
+        """Yield encoded page in chunks."""
+        yield self.head.encode()
+        for chunk in load_html(self.path):
+            yield chunk.encode()
+        yield self.tail.encode()
+
+
+class Preprocessor:
+    """
+    Base of plugins changing content of note before it is converted.
+
+    Subclass implements `process` and, when its result depends on options,
+    extends `key`. Result is cached by `Preprocessing` under hash of `key`,
+    note content and path, it is valid as long as files listed as
+    dependencies do not change.
+    """
+
+    cached = True
+    """Whether `Preprocessing` caches result, cheap plugins disable it."""
+
+    def key(self) -> str:
+        """Return string identifying plugin and options changing output."""
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+    def process(self, content, path):
+        """Return processed content of note and paths of files it used.
+
+        Parameters
+        ----------
+        content : str
+            note content, already changed by preceding plugins
+        path : pathlib.Path
+            path to `.md` file containing note
+
+        Returns
+        -------
+        tuple
+            containing processed content and list of paths to files which
+            content was used
+        """
+        raise NotImplementedError
+
+
+class Include(Preprocessor):
+    """
+    Replace `{!include path!}` directive with content of file.
+
+    Path is relative to directory of note. Included files can include other
+    ones, up to `DEPTH` levels.
+    """
+
+    DEPTH = 8
+    PATTERN = re.compile(r"\{!include\s+(.+?)\s*!\}")
+
+    def process(self, content, path, depth=0):
+        """Return note with included files and paths to them."""
+        dependencies = []
+
+        def replace(match):
+            if depth >= self.DEPTH:
+                raise ValueError(f"{path}: includes nested too deep")
+            source = path.parent / match.group(1)
+            try:
+                text = load(source)
+            except OSError as error:
+                raise ValueError(f"{path}: cannot include {source}: {error}")
+            text, nested = self.process(text, source, depth + 1)
+            dependencies.extend([source, *nested])
+            return text
+
+        return self.PATTERN.sub(replace, content), dependencies
+
+
+class Code(Preprocessor):
+    """
+    Replace `{!code path!}` directive with fenced code block of file.
+
+    Path is relative to directory of note. Part of file can be selected:
+    `{!code path:10-20!}` takes lines from 10 to 20, `{!code path:name!}`
+    takes top-level function or class `name` with its decorators from Python
+    file. Language of block is taken from file suffix.
+    """
+
+    PATTERN = re.compile(r"\{!code\s+(.+?)(?::([\w.-]+))?\s*!\}")
+
+    def process(self, content, path):
+        """Return note with code blocks and paths to their files."""
+        dependencies = []
+
+        def replace(match):
+            source = path.parent / match.group(1)
+            try:
+                lines = load(source).splitlines()
+            except OSError as error:
+                raise ValueError(f"{path}: cannot read {source}: {error}")
+            part = match.group(2)
+            if part:
+                start, end = self.select(lines, part, source)
+                lines = lines[start - 1:end]
+            dependencies.append(source)
+            code = "\n".join(lines)
+            longest = max(map(len, re.findall("`+", code)), default=0)
+            fence = "`" * max(3, longest + 1)
+            return f"{fence}{source.suffix[1:]}\n{code}\n{fence}"
+
+        return self.PATTERN.sub(replace, content), dependencies
+
+    @staticmethod
+    def select(lines, part, source):
+        """Return first and last line number of selected part of file.
+
+        Parameters
+        ----------
+        lines : list
+            lines of file
+        part : str
+            range of lines, e.g. "10-20", or name of top-level Python
+            function or class
+        source : pathlib.Path
+            path to file, used in error message
+
+        Returns
+        -------
+        tuple
+            containing first and last line number, counted from 1
+
+        Raises
+        ------
+        ValueError
+            if part cannot be found in file
+        """
+        if re.fullmatch(r"\d+-\d+", part):
+            start, end = map(int, part.split("-"))
+            return start, end
+        import ast
+
+        tree = ast.parse("\n".join(lines), str(source))
+        for node in tree.body:
+            if getattr(node, "name", None) == part:
+                decorators = getattr(node, "decorator_list", ())
+                start = min([node.lineno, *(d.lineno for d in decorators)])
+                return start, node.end_lineno
+        raise ValueError(f"{source}: {part} not found")
+
+
+class Variables(Preprocessor):
+    """
+    Replace `{{ name }}` with value of set variable, unknown ones are left.
+
+    ...
+
+    Attributes
+    ----------
+    values : dict
+        variable name mapped to its value
+    """
+
+    PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+    cached = False
+
+    def __init__(self, values):
+        """Set values of variables."""
+        self.values = dict(values)
+
+    def key(self):
+        """Return plugin identifier with values of variables."""
+        return super().key() + json.dumps(self.values, sort_keys=True)
+
+    def process(self, content, path):
+        """Return note with substituted variables, it uses no files."""
+        def replace(match):
+            return self.values.get(match.group(1), match.group(0))
+
+        return self.PATTERN.sub(replace, content), []
+
+
+PREPROCESSORS = {"code": Code, "include": Include}
+"""Name of built-in preprocessor mapped to its class."""
+
+
+def load_preprocessor(name):
+    """Return preprocessor with set name.
+
+    Parameters
+    ----------
+    name : str
+        name of built-in preprocessor (see `PREPROCESSORS`) or path to
+        callable returning preprocessor in "module:attribute" format, e.g.
+        "package.plugins:Links"
+
+    Returns
+    -------
+    Preprocessor
+        object with `key` and `process` methods
+    """
+    if name in PREPROCESSORS:
+        return PREPROCESSORS[name]()
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown preprocessor: {name}")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+class Preprocessing:
+    """
+    Run preprocessors on notes caching result of each of them.
+
+    Result is stored in `Cache` under hash of preprocessor `key`, note
+    content and its path together with modification time and size of files
+    it depends on. It is reused until any of these files changes. Results of
+    preprocessors which are not `Preprocessor.cached` are never stored, as
+    running them is cheaper than reading cache. Cache is pruned like cache of
+    rendered pages, least recently used results are removed first.
+
+    ...
+
+    Attributes
+    ----------
+    preprocessors : list
+        objects run one after another on content of each note
+    cache : Cache or None
+        cache where results are stored, `None` when they are not
+    """
+
+    def __init__(self, preprocessors, directory="preprocessed",
+                 size=64 * 2 ** 20):
+        """Set preprocessors and cache of their results.
+
+        Parameters
+        ----------
+        preprocessors : iterable
+            objects run one after another on content of each note, see
+            `Preprocessor`
+        directory : pathlib.Path, str or None, optional
+            path to directory where results are cached, relative one is
+            located in `CACHE`, `None` disables caching (default is
+            "preprocessed")
+        size : int, optional
+            maximal size of cache in bytes (default is 64 MiB)
+        """
+        self.preprocessors = list(preprocessors)
+        self.cache = None if directory is None else Cache(CACHE / directory,
+                                                          size)
+
+    def __bool__(self):
+        """Check if there is any preprocessor."""
+        return bool(self.preprocessors)
+
+    def __iter__(self):
+        """Iterate over preprocessors."""
+        return iter(self.preprocessors)
+
+    def run(self, content, path):
+        """Return note content changed by all preprocessors.
+
+        Parameters
+        ----------
+        content : str
+            note content
+        path : pathlib.Path
+            path to `.md` file containing note
+
+        Returns
+        -------
+        tuple
+            containing processed content and set of paths to files it
+            depends on
+        """
+        dependencies = set()
+        for preprocessor in self.preprocessors:
+            if self.cache is None or not preprocessor.cached:
+                content, used = preprocessor.process(content, Path(path))
+                dependencies.update(map(Path, used))
+                continue
+            key = digest(json.dumps([preprocessor.key(), str(path), content]))
+            cached = self.get(key)
+            if cached is None:
+                content, used = preprocessor.process(content, Path(path))
+                self.put(key, content, used)
+                used = {Path(p) for p in used}
+            else:
+                content, used = cached
+            dependencies.update(used)
+        return content, dependencies
+
+    def get(self, key):
+        """Return cached result unless it is missing or outdated.
+
+        Parameters
+        ----------
+        key : str
+            hash of preprocessor, note content and path
+
+        Returns
+        -------
+        tuple or None
+            containing processed content and set of paths it depends on
+        """
+        try:
+            data = json.loads(self.cache.get(key) or "")
+        except ValueError:
+            return None
+        for path, state in data["dependencies"].items():
+            if self.state(path) != state:
+                return None
+        return data["content"], set(map(Path, data["dependencies"]))
+
+    def put(self, key, content, dependencies):
+        """Store result of preprocessor, see `Cache.put`.
+
+        Parameters
+        ----------
+        key : str
+            hash of preprocessor, note content and path
+        content : str
+            processed content
+        dependencies : iterable
+            paths to files processed content depends on
+        """
+        states = {str(path): self.state(path) for path in dependencies}
+        data = json.dumps({"content": content, "dependencies": states})
+        self.cache.put(key, data)
+
+    def prune(self):
+        """Remove least recently used results when any was stored."""
+        if self.cache is not None and self.cache.misses:
+            self.cache.prune()
+
+    @staticmethod
+    def state(path):
+        """Return modification time and size of file, `None` when missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+
+class Converter:
+    """
+    Class responsible for `.md` files conversion to `Note` objects.
+
+    It preserves original directory structure. The same object can convert
+    notes again after they change, see `refresh`, then only changed notes are
+    read and preprocessed again.
+
+    ...
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        project path leading to directory containing `.md` files to convert
+    files : list
+        containing paths to collected files
+    directories : list
+        containing paths to collected directories
+    scanned : dict
+        path of each scanned directory (also without notes) and of `IGNORE`
+        file mapped to its state (see `Preprocessing.state`) at collection
+    known : dict
+        path of each note read by `convert` mapped to tuple with its state,
+        states of files used by preprocessors and result of reading, it is
+        reused while they do not change (empty for `lazy` conversion)
+    hashes : dict
+        module name of each converted note mapped to hash of its content and
+        of files it includes with `.. include::`
+    links : dict
+        module name of each converted note mapped to names it may link to
+    patterns : list
+        glob patterns of files and directories to skip passed by user
+    exclude : list
+        glob patterns of files and directories skipped during collection,
+        `patterns` together with ones from `IGNORE` file
+    limit : int
+        size in bytes above which note is not converted but shown as
+        preformatted text
+    preprocessing : Preprocessing
+        preprocessors run on content of each note before it is converted
+    dependencies : dict
+        module name of each converted note mapped to set of paths to files
+        which content was used by preprocessors or included by `pdoc`
+    """
+
+    RAW = "Large note shown as preformatted text."
+
+    def __init__(self, path, exclude=(), limit=LIMIT, preprocessors=()):
+        """Collect `.md` files and directories paths from set location.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            path to directory containing `.md` files
+        exclude : iterable, optional
+            glob patterns of files and directories to skip, they are used
+            together with patterns from `IGNORE` file (default is `()`)
+        limit : int, optional
+            size in bytes above which note is shown as preformatted text
+            (default is `LIMIT`)
+        preprocessors : iterable or Preprocessing, optional
+            objects changing content of each note before it is converted, see
+            `Preprocessor`, `Preprocessing` object sets also cache of their
+            results (default is `()`)
+        """
+        self.path = path
+        self.limit = limit
+        if isinstance(preprocessors, Preprocessing):
+            self.preprocessing = preprocessors
+        else:
+            self.preprocessing = Preprocessing(preprocessors)
+        self.dependencies = {}
+        self.known = {}
+        self.hashes = {}
+        self.links = {}
+        self.patterns = list(exclude)
+        self.scanned = {}
+        self.refresh()
+
+    def refresh(self):
+        """Collect files again unless no scanned directory changed.
+
+        Adding, removing or renaming entry changes modification time of its
+        directory, so only states of `self.scanned` are compared instead of
+        walking whole tree.
+
+        Returns
+        -------
+        bool
+            information if files were collected again
+        """
+        if self.scanned and all(Preprocessing.state(path) == state
+                                for path, state in self.scanned.items()):
+            return False
+        self.files = []
+        self.directories = []
+        ignore = self.path / IGNORE
+        self.scanned = {ignore: Preprocessing.state(ignore)}
+        self.exclude = self.read_ignore() + self.patterns
+        self.collect(self.path)
+        return True
+
+    def convert(self, context, lazy=False, index=None):
+        """Convert all collected files to tree of `Note` objects.
+
+        Content of each file becomes docstring of module named after its
+        relative path to project directory. `README.md` content is used as
+        docstring of directory containing it. Directories become packages
+        when they lead to any note. Files and directories which names would
+        not be public in `pdoc` (starting with `_` or `.`, containing `.`) are
+        skipped. Notes larger than `self.limit` are never loaded as a whole,
+        only hashed, their docstring is `RAW` and page shows them as
+        preformatted text (see `Notes.html`). Other notes are changed by
+        `self.preprocessing` first, hash of their processed content and of
+        files they include with `.. include::` is kept.
+
+        Parameters
+        ----------
+        context : pdoc.Context
+            `pdoc` lookup table where created modules will be registered
+        lazy : bool, optional
+            do not keep notes content in memory, it is read again by
+            `Note.read` when needed (default is `False`)
+        index : Index or None, optional
+            search index where content of each note is added, `None` when
+            notes are not indexed (default is `None`)
+
+        Returns
+        -------
+        Note
+            object representing project directory, contains other notes as
+            its submodules
+        """
+        def read(path):
+            state = Preprocessing.state(path)
+            known = self.known.get(path)
+            if known is not None and known[0] == state and all(
+                    Preprocessing.state(p) == s for p, s in known[1].items()):
+                return known[2]
+            if os.path.getsize(path) > self.limit:
+                result = path, None, load_hash(path), ()
+            else:
+                content, used = load(path), ()
+                if self.preprocessing:
+                    content, used = self.preprocessing.run(content, path)
+                key = digest(content)
+                files = included(content, path)
+                if files:
+                    key = digest(json.dumps([key, *[
+                        load_hash(p) if p.is_file() else "" for p in files]]))
+                result = path, content, key, [*used, *files]
+            if not lazy:
+                used = {p: Preprocessing.state(p) for p in result[3]}
+                self.known[path] = (state, used, result)
+            return result
+
+        self.dependencies, self.hashes, self.links = {}, {}, {}
+        self.known = {p: self.known[p] for p in self.files if p in self.known}
+        notes = {}
+        packages = {self.path.name}
+        raw = set()
+        size = QUEUE if lazy else THREADS
+        for path, content, key, used in pipeline(read, self.files,
+                                                 size=size):
+            name = self.name(path)
+            self.dependencies[name] = set(used)
+            self.hashes[name] = key
+            if content is None:
+                raw.add(name)
+                self.links[name] = set()
+                notes[name] = (path, self.RAW)
+            else:
+                self.links[name] = identifiers(content)
+                notes[name] = (path, None if lazy else content)
+                if index is not None:
+                    index.add(name, content)
+            packages.update(ancestors(name))
+            if path.stem.upper() == "README":
+                packages.add(name)
+
+        note = note_class()
+        modules = {}
+        names = sorted(packages | notes.keys(), key=lambda n: n.count("."))
+        for name in names:
+            path, content = notes.get(name, (None, ""))
+            supermodule = modules.get(name.rpartition(".")[0])
+            modules[name] = note(name, content, path, name in packages,
+                                 supermodule, context, name in raw)
+            if self.preprocessing:
+                modules[name].preprocessing = self.preprocessing
+        return modules[self.path.name]
+
+    def name(self, path):
+        """Return name of module created from note located in set path.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            path to `.md` file
+
+        Returns
+        -------
+        str
+            module name, e.g. `notes.topic.note`, for `README.md` name of its
+            directory is returned
+        """
+        parts = path.relative_to(self.path.parent).with_suffix("").parts
+        if path.stem.upper() == "README":
+            parts = parts[:-1]
+        return ".".join(parts)
+
+    def collect(self, directory):
+        """Collect all files from set directory.
+
+        Iterate through entries in set directory with `os.scandir` and place
+        them in `self.directories` or `self.files`. When folder is met call
+        self again with that path. Only directories leading to `.md` files are
+        kept. Entries matching `self.exclude` patterns and entries which names
+        would not be public in `pdoc` (starting with `_` or `.`, containing
+        `.` in module name) are skipped together with their content. In case
+        of `PermissionError` skip that location.
+
+        Parameters
+        ----------
+        directory : pathlib.Path
+            directory from which paths will be collected
+
+        Returns
+        -------
+        bool
+            information if any `.md` file was collected from set directory
+        """
+        found = False
+        self.scanned[directory] = Preprocessing.state(directory)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if self.is_skipped(entry):
+                        continue
+                    path = Path(entry.path)
+                    if entry.is_dir():
+                        if self.collect(path):
+                            self.directories.append(path)
+                            found = True
+                    else:
+                        self.files.append(path)
+                        found = True
+                except PermissionError:
+                    pass
+        return found
+
+    def is_skipped(self, entry):
+        """Check if entry should be omitted during collection.
+
+        Parameters
+        ----------
+        entry : os.DirEntry
+            entry obtained from `os.scandir`, its cached type is used
+
+        Returns
+        -------
+        bool
+            information if entry is neither directory nor `.md` file, is not
+            public or matches `self.exclude` patterns
+        """
+        directory = entry.is_dir()
+        name, suffix = os.path.splitext(entry.name)
+        if directory:
+            name = entry.name
+        elif suffix != ".md":
+            return True
+        return (not self.is_public(name)
+                or self.is_excluded(entry.path, directory))
+
+    def is_excluded(self, path, directory):
+        """Check if entry matches any of `self.exclude` patterns.
+
+        Pattern is compared with entry name and its path relative to project
+        directory. Pattern ending with `/` matches only directories.
+
+        Parameters
+        ----------
+        path : str
+            path to checked file or directory
+        directory : bool
+            information if entry is directory
+
+        Returns
+        -------
+        bool
+            information if entry should be skipped
+        """
+        relative = Path(path).relative_to(self.path).as_posix()
+        name = relative.rpartition("/")[2]
+        for pattern in self.exclude:
+            if pattern.endswith("/"):
+                if not directory:
+                    continue
+                pattern = pattern[:-1]
+            if fnmatch(name, pattern) or fnmatch(relative, pattern):
+                return True
+        return False
+
+    @staticmethod
+    def is_public(name):
+        """Check if module with set name would be public in `pdoc`.
+
+        Parameters
+        ----------
+        name : str
+            name of directory or `.md` file without suffix
+
+        Returns
+        -------
+        bool
+            information if entry can become module
+        """
+        return not name.startswith(("_", ".")) and "." not in name
+
+    def read_ignore(self):
+        """Return patterns from `IGNORE` file placed in project directory.
+
+        Each line of file holds one pattern, empty lines and lines starting
+        with `#` are skipped.
+
+        Returns
+        -------
+        list
+            patterns of files and directories to skip
+        """
+        try:
+            lines = load(self.path / IGNORE).splitlines()
+        except OSError:
+            return []
+        return [line.strip() for line in lines
+                if line.strip() and not line.lstrip().startswith("#")]
+
+
+def note_class():
+    """Return `Note` class, it is defined on first call.
+
+    `Note` subclasses `pdoc.Module`, so `pdoc` is imported only when notes are
+    converted, which keeps import of this module cheap. Class is also
+    available as `Note` attribute of this module.
+    """
+    global Note
+    if "Note" in globals():
+        return Note
+    import inspect
+    from types import ModuleType
+
+    import pdoc
+
+    class Note(pdoc.Module):
+        """
+        `pdoc.Module` created directly from `.md` note content.
+
+        Documented object is empty `types.ModuleType` with note content as
+        its docstring, so nothing has to be saved or imported. Set `path` is
+        used as module `__file__` which allows `pdoc` to resolve
+        `.. include::` directives relative to note location. Lazy note keeps
+        only its place in module tree, its content is read by `read` right
+        before it is needed and dropped by `release` afterwards.
+
+        ...
+
+        Attributes
+        ----------
+        lazy : bool
+            information if note content is read from file only when needed
+        loaded : bool
+            information if note content is currently set as docstring
+        raw : bool
+            information if page shows file as preformatted text
+        preprocessing : Preprocessing or None
+            preprocessors run on content of lazy note when it is read, `None`
+            when there are none
+        """
+
+        _submodules = None
+        preprocessing = None
+
+        def __init__(self, name, content="", path=None, package=False,
+                     supermodule=None, context=None, raw=False):
+            """Create module and register it in `context` and `supermodule`.
+
+            Parameters
+            ----------
+            name : str
+                module name, e.g. `notes.topic.note`
+            content : str or None, optional
+                note content used as module docstring, `None` makes note lazy
+                (default is "")
+            path : pathlib.Path or None, optional
+                path to `.md` file containing note (default is `None`)
+            package : bool, optional
+                information if module represents directory (default is
+                `False`)
+            supermodule : Note or None, optional
+                parent module of created one (default is `None`)
+            context : pdoc.Context or None, optional
+                `pdoc` lookup table where module is registered, when not set
+                new one is created (default is `None`)
+            raw : bool, optional
+                information if file content is shown as preformatted text
+                instead of content (default is `False`)
+            """
+            self.raw = raw
+            self.lazy = content is None
+            self.loaded = not self.lazy
+            docstring = "" if self.lazy else inspect.cleandoc(content)
+            module = ModuleType(name, docstring)
+            if path is not None:
+                module.__file__ = str(path)
+            if package:
+                module.__path__ = []
+            pdoc.Doc.__init__(self, name, self, module, docstring)
+
+            self._context = pdoc.Context() if context is None else context
+            self._is_inheritance_linked = False
+            self._skipped_submodules = set()
+            self.supermodule = supermodule
+            self.doc = {}
+
+            self._context[self.refname] = self
+            if supermodule is not None:
+                supermodule.doc[name.rpartition(".")[2]] = self
+                supermodule._submodules = None
+
+        def submodules(self):
+            """Return sorted submodules, they are sorted only once.
+
+            Navigation of each page lists submodules of its note and of its
+            parent, so sorting them again for every page is avoided.
+            """
+            if self._submodules is None:
+                self._submodules = super().submodules()
+            return self._submodules
+
+        def html(self, minify=True, **kwargs):
+            """Return page of note, see `pdoc.Module.html`.
+
+            `pdoc` reads configuration by compiling `config.mako` again for
+            every page, here it is read once per compiled template and reused.
+            Passed `kwargs` are checked by `pdoc`, so unknown ones are still
+            reported. Private `pdoc` functions used here are the reason why
+            its version is pinned in requirements.
+            """
+            from pdoc.html_helpers import minify_html
+
+            lookup = pdoc.tpl_lookup
+            key = lookup.get_template("/config.mako")
+            if kwargs:
+                config = dict(pdoc._get_config(**kwargs), module=self)
+            else:
+                if key not in _configs:
+                    _configs[key] = pdoc._get_config()
+                config = dict(_configs[key], module=self)
+            html = lookup.get_template("/html.mako").render(**config).strip()
+            if minify:
+                html = minify_html(html)
+            return html if html.endswith("\n") else html + "\n"
+
+        def read(self):
+            """Set content of lazy note read from its file as docstring.
+
+            Note which content was already read is not read again until it
+            is released.
+            """
+            if self.lazy and not self.loaded:
+                content = load(self.obj.__file__)
+                if self.preprocessing is not None:
+                    content, _ = self.preprocessing.run(content,
+                                                        self.obj.__file__)
+                docstring = inspect.cleandoc(content)
+                pdoc.Doc.__init__(self, self.name, self, self.obj, docstring)
+                self.loaded = True
+
+        def release(self):
+            """Drop docstring of lazy note to free memory."""
+            if self.lazy:
+                self.docstring = ""
+                self.loaded = False
+
+    return Note
+
+
+def __getattr__(name):
+    """Return `Note` class from `note_class` when it is not defined yet."""
+    if name == "Note":
+        return note_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class Notes:
+    """
+    Class interacting with `pdoc` to create `html` notes.
+
+    ...
+
+    Attributes
+    ----------
+    destination : pathlib.Path
+        path to project directory where folder from `self.name` will be created
+    name : str, optional
+        name of directory where `html` files will be stored (default is "docs")
+    module : pdoc.Module
+        `pdoc` object representing module from which notes will be generated
+    context : pdoc.Context
+        `pdoc` lookup table containing all modules from `self.module` tree
+    arguments : tuple
+        arguments used to create object, needed to recreate it in workers
+    cache : Cache or None
+        cache of rendered pages, `None` when pages are always rendered
+    stream : bool
+        information if notes content is read only for rendering their pages
+    index : Index or None
+        search index of notes, `None` when notes are not indexed
+    """
+
+    def __init__(self, converter, name="docs", templates=None, cache=None,
+                 stream=False, index=None):
+        """Set notes templates. Convert notes and initialize `pdoc` linker.
+
+        Parameters
+        ----------
+        converter : Converter
+            object with collected `.md` files, its path is used as
+            `self.destination`
+        templates : pathlib.Path or None, optional
+            path to directory containing customized templates which will be
+            used to create `html` notes (default is `None`)
+        cache : Cache or None, optional
+            cache of rendered pages shared between builds (default is `None`)
+        stream : bool, optional
+            keep only module tree in memory, content of each note is read
+            right before its page is rendered and released once it is done
+            (default is `False`)
+        index : Index or None, optional
+            search index filled with notes content while they are converted
+            (default is `None`)
+        """
+        self.destination = converter.path
+        self.name = name
+        self.arguments = (converter, name, templates, None, stream)
+        self.cache = cache
+        self.stream = stream
+        self.index = index
+        self.set_templates(templates)
+
+        import pdoc
+
+        self.context = pdoc.Context()
+        self.module = converter.convert(self.context, stream, index)
+        pdoc.link_inheritance(self.context)
+
+    def generate(self, names=None, jobs=1, directory=None, stats=None,
+                 compressor=None, progress=None, assets=None):
+        """Create `html` notes in `self.destination`/`self.name` directory.
+
+        Pages are saved in order they are rendered, each under path obtained
+        from its own `url`, so parallel rendering gives the same result. Page
+        is written only when its content differs from existing file. Writing
+        is done by `pipeline` threads while next pages are rendered.
+
+        Parameters
+        ----------
+        names : set or None, optional
+            names of modules which pages will be created, `None` when all of
+            them should be created (default is `None`)
+        jobs : int, optional
+            number of processes rendering pages, all available processors
+            are used when lower than 1 (default is 1)
+        directory : pathlib.Path or None, optional
+            path to directory used instead of `self.destination`/`self.name`,
+            e.g. staging one (default is `None`)
+        stats : Stats or None, optional
+            object recording duration of rendering and writing pages, `None`
+            when nothing is recorded (default is `None`)
+        compressor : Compressor or None, optional
+            object saving compressed copies of written pages, `None` when
+            they are not needed (default is `None`)
+        progress : Progress or None, optional
+            object notified about each saved page, `None` when progress is
+            not reported (default is `None`)
+        assets : Assets or None, optional
+            object moving shared stylesheets and scripts of pages to separate
+            files, `None` when they stay inline (default is `None`)
+        """
+        directory = directory or self.destination / self.name
+
+        def save(page):
+            start = time.perf_counter()
+            url, content = page
+            files = [(self.relative(url), content)]
+            if assets is not None:
+                content, created = assets.extract(files[0][0], content)
+                files = [(files[0][0], content), *created]
+            written = 0
+            for name, content in files:
+                path = directory / name
+                size = write(path, content)
+                if compressor is not None:
+                    compressor.add(path, content, bool(size))
+                written += size
+            return url, written, time.perf_counter() - start
+
+        pages = self.render(names, jobs)
+        if stats is not None:
+            pages = self.timed(pages, stats)
+        for url, written, duration in pipeline(save, pages):
+            if progress is not None:
+                progress.step(url, written)
+            if stats is not None:
+                stats.add("write", duration, pages=int(bool(written)),
+                          written=written)
+        if stats is None:
+            return
+        stats.sample("render")
+        stats.sample("write")
+
+    @staticmethod
+    def timed(pages, stats):
+        """Yield pages from set iterator recording time spent to obtain them.
+
+        Parameters
+        ----------
+        pages : iterator
+            pages yielded by `self.render`
+        stats : Stats
+            object where duration of rendering each page is added
+
+        Yields
+        ------
+        tuple
+            containing module `url` and its `html` content
+        """
+        pages = iter(pages)
+        while True:
+            start = time.perf_counter()
+            page = next(pages, None)
+            if page is None:
+                return
+            stats.add("render", time.perf_counter() - start, pages=1)
+            yield page
+
+    def render(self, names=None, jobs=1):
+        """Obtain `url` and `html` content of pages using set number of jobs.
+
+        Pages found in `self.cache` are not rendered again, all others are
+        stored there once they are rendered. Streamed pages of raw notes are
+        never cached. Pool rendering pages is created before any page is
+        yielded, so its processes are forked before consumer starts threads
+        (e.g. writing or compressing pages).
+
+        Parameters
+        ----------
+        names : set or None, optional
+            names of modules which content will be obtained, `None` when all
+            of them should be processed (default is `None`)
+        jobs : int, optional
+            number of processes rendering pages, all available processors
+            are used when lower than 1 (default is 1)
+
+        Yields
+        ------
+        tuple
+            containing module `url` and its `html` content
+        """
+        modules = [module for module in self.walk(self.module)
+                   if names is None or module.name in names]
+        keys, hits = {}, []
+        if self.cache is not None:
+            templates = self.templates_hash()
+            for module in modules:
+                if module.raw:
+                    continue
+                module.read()
+                key = self.cache.key(module, templates)
+                module.release()
+                if self.cache.locate(key).exists():
+                    hits.append((module, key))
+                else:
+                    self.cache.misses += 1
+                    keys[module.url()] = key
+            modules = [module for module in modules
+                       if module.raw or module.url() in keys]
+
+        pages = self.dispatch([m.name for m in modules], jobs)
+        for module, key in hits:
+            content = self.cache.get(key)
+            if content is None:
+                content = self.html(module)
+                self.cache.put(key, content)
+            yield module.url(), content
+        for url, content in pages:
+            if url in keys:
+                self.cache.put(keys[url], content)
+            yield url, content
+
+    def dispatch(self, names, jobs=1):
+        """Render pages of modules with set names using set number of jobs.
+
+        With more than one job pages are rendered by `multiprocessing.Pool`.
+        Each worker uses copy of `self` (inherited when processes are forked
+        or created again from `self.arguments`), so it can resolve links to
+        all other pages. Pool is created right when this method is called,
+        pages are rendered while returned iterator is consumed.
+
+        Parameters
+        ----------
+        names : list
+            names of modules which pages will be rendered
+        jobs : int, optional
+            number of processes rendering pages, all available processors
+            are used when lower than 1 (default is 1)
+
+        Returns
+        -------
+        iterator
+            tuples containing module `url` and its `html` content, in order
+            of completion
+        """
+        global _notes
+        jobs = min(jobs if jobs > 0 else os.cpu_count() or 1, len(names))
+        if jobs <= 1:
+            return self.get(self.module, set(names))
+
+        import multiprocessing
+
+        _notes = self
+        try:
+            pool = multiprocessing.Pool(jobs, _initialize, self.arguments)
+        finally:
+            _notes = None
+
+        def results():
+            with pool:
+                chunk = max(1, len(names) // (jobs * 4))
+                yield from pool.imap_unordered(_render, names, chunk)
+        return results()
+
+    def get(self, module, names=None):
+        """Obtain `url` and `html` content from set module and its submodules.
+
+        Paramters
+        ---------
+        module : pdoc.Module
+            object from which `url` and `html` content will be obtained, can
+            contain submodules
+        names : set or None, optional
+            names of modules which content will be obtained, `None` when all
+            of them should be processed (default is `None`)
+
+        Yields
+        ------
+        tuple
+            containing module `url` and its `html` content
+        """
+        modules = [m for m in self.walk(module)
+                   if names is None or m.name in names]
+        if self.stream:
+            modules = pipeline(self.prefetch, modules)
+        for module in modules:
+            yield module.url(), self.html(module)
+
+    @staticmethod
+    def prefetch(module):
+        """Read content of lazy note in advance and return its module."""
+        module.read()
+        return module
+
+    @staticmethod
+    def html(module):
+        """Return `html` content of set module.
+
+        Content of lazy note is read only for rendering and released after.
+        File of raw note is inserted as preformatted text after its notice,
+        it is not processed by `pdoc`.
+
+        Parameters
+        ----------
+        module : Note
+            module which page is rendered
+
+        Returns
+        -------
+        str or Preformatted
+            `html` content of page, streamed one for raw note
+        """
+        module.read()
+        try:
+            page = module.html()
+        finally:
+            module.release()
+        if module.raw:
+            notice = f"<p>{Converter.RAW}</p>"
+            head, _, tail = page.partition(notice)
+            return Preformatted(head + notice, module.obj.__file__, tail)
+        return page
+
+    def walk(self, module):
+        """Yield set module and recursively all its submodules.
+
+        Parameters
+        ----------
+        module : pdoc.Module
+            object from which walk starts
+
+        Yields
+        ------
+        pdoc.Module
+            set module or one of its submodules
+        """
+        yield module
+        for submodule in module.submodules():
+            yield from self.walk(submodule)
+
+    def navigation(self):
+        """Return navigation structure of all pages computed in one walk.
+
+        Returns
+        -------
+        dict
+            page path relative to `html` notes directory mapped to dict with
+            its `title`, `parent` page (`None` for main page) and list of
+            `children` pages
+        """
+        pages = {}
+        for module in self.walk(self.module):
+            supermodule = module.supermodule
+            title = module.name.rpartition(".")[2].title().replace("_", " ")
+            pages[self.relative(module.url())] = {
+                "title": title,
+                "parent": supermodule and self.relative(supermodule.url()),
+                "children": [self.relative(submodule.url())
+                             for submodule in module.submodules()],
+            }
+        return pages
+
+    @staticmethod
+    def relative(url):
+        """Return page path relative to `html` notes directory.
+
+        Parameters
+        ----------
+        url : str
+            module `url` starting with name of project directory
+
+        Returns
+        -------
+        str
+            path where page is saved inside notes directory
+        """
+        return "/".join(Path(url).parts[1:])
+
+    @staticmethod
+    def links(module, names):
+        """Return links `pdoc` creates in page of set module.
+
+        Parameters
+        ----------
+        module : pdoc.Module
+            module which page is rendered
+        names : iterable
+            names found in module docstring, see `identifiers`
+
+        Returns
+        -------
+        dict
+            each name resolved to documented object mapped to its `url`
+        """
+        import pdoc
+
+        links = {}
+        for name in sorted(names):
+            found = module.find_ident(name)
+            if not isinstance(found, pdoc.External):
+                links[name] = found.url()
+        return links
+
+    @staticmethod
+    def templates_hash():
+        """Return hash of currently used templates and `pdoc` version."""
+        import pdoc
+
+        return hash_templates(pdoc.tpl_lookup.directories)
+
+    def set_templates(self, directory):
+        """Set `pdoc` templates according to available options.
+
+        When passed path contains templates then they are used. If not folder
+        `templates` in `self.destination` is checked. If still nothing is
+        found templates from installation directory are taken. If it could not
+        find them anywhere templates provided with `pdoc` are used.
+
+        Parameters
+        ----------
+        directory : pathlib.Path or None
+            path to directory containing templates, `None` when not specified
+        """
+        if not self.change_templates(find_templates(directory,
+                                                    self.destination)):
+            import pdoc
+
+            pdoc.tpl_lookup = _lookups.setdefault(None, pdoc.tpl_lookup)
+
+    def change_templates(self, path):
+        """Change `pdoc` templates if set `path` contains all necessary files.
+
+        Directory is validated only once, then its lookup created by
+        `create_lookup` is stored and reused, so compiled templates stay in
+        memory between builds run by the same process.
+
+        Parameters
+        ----------
+        path : pathlib.Path or None
+            path to directory containing templates, `None` when not specified
+
+        Returns
+        -------
+        bool
+            information if templates were changed or not
+        """
+        if path is None:
+            return False
+        lookup = _lookups.get(path)
+        if lookup is None:
+            if not self.has_templates(path):
+                return False
+            lookup = _lookups[path] = create_lookup(path)
+        import pdoc
+
+        _lookups.setdefault(None, pdoc.tpl_lookup)
+        pdoc.tpl_lookup = lookup
+        return True
+
+    @staticmethod
+    def has_templates(directory):
+        """Check if templates files are stored in set `directory`.
+
+        Parameters
+        ----------
+        directory : pathlib.Path
+            path to directory which will be checked if templates are there
+
+        Returns
+        -------
+        bool
+            information if folder contains templates or not
+        """
+        templates = ("config", "credits", "css", "head", "html", "logo")
+        try:
+            files = set(path.name for path in directory.iterdir())
+            expected = set(f"{name}.mako" for name in templates)
+            return not expected - files
+        except ACCESS_ERRORS:
+            return False
+
+
+def _initialize(*arguments):
+    """Create `Notes` object in worker process unless it was inherited."""
+    global _notes
+    if _notes is None:
+        _notes = Notes(*arguments)
+
+
+def _render(name):
+    """Return `url` and `html` content of module with set name."""
+    module = _notes.context[name]
+    return module.url(), _notes.html(module)
+
+
+class Cache:
+    """
+    Content-addressed cache of rendered pages shared between builds.
+
+    Page is stored in set directory under hash of everything used to render
+    it: note content, `url` of module, its parent, submodules and modules it
+    refers to, templates and `pdoc` version. Thanks to that it can be reused
+    by any build with identical input, e.g. in fresh checkout. Each hit
+    updates modification time of entry, so `prune` removes least recently
+    used pages when cache exceeds its size.
+
+    ...
+
+    Attributes
+    ----------
+    directory : pathlib.Path
+        path to directory where cached pages are stored
+    size : int
+        maximal size of cache in bytes
+    hits : int
+        number of pages taken from cache
+    misses : int
+        number of pages which had to be rendered
+    evictions : int
+        number of pages removed by `prune`
+    errors : int
+        number of pages which could not be stored
+    """
+
+    def __init__(self, directory, size=256 * 2 ** 20):
+        """Set cache location and its size.
+
+        Parameters
+        ----------
+        directory : pathlib.Path
+            path to directory where cached pages are stored
+        size : int, optional
+            maximal size of cache in bytes (default is 256 MiB)
+        """
+        self.directory = directory
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def __str__(self):
+        """Return cache statistics."""
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0
+        errors = f", {self.errors} write errors" if self.errors else ""
+        return (f"Cache: {self.hits} hits, {self.misses} misses "
+                f"({ratio:.0%} hit ratio), {self.evictions} evictions"
+                f"{errors}")
+
+    @staticmethod
+    def key(module, templates):
+        """Return hash identifying rendered page of set module.
+
+        Parameters
+        ----------
+        module : pdoc.Module
+            module which page is rendered
+        templates : str
+            hash of used templates, see `Notes.templates_hash`
+
+        Returns
+        -------
+        str
+            key of page in cache
+        """
+        references = Notes.links(module, identifiers(module.docstring))
+        supermodule = module.supermodule
+        data = [templates, module.url(), module.docstring,
+                supermodule and supermodule.url(),
+                [submodule.url() for submodule in module.submodules()],
+                sorted(references.items())]
+        return digest(json.dumps(data))
+
+    def locate(self, key):
+        """Return path of cache entry with set key."""
+        return self.directory / key[:2] / key
+
+    def get(self, key):
+        """Return cached page content or `None` when it is not stored.
+
+        Parameters
+        ----------
+        key : str
+            key of page obtained from `self.key`
+
+        Returns
+        -------
+        str or None
+            `html` content of page
+        """
+        path = self.locate(key)
+        try:
+            content = path.read_bytes().decode()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return content
+
+    def put(self, key, content):
+        """Store page content under set key.
+
+        Content is saved by `write`, so other builds sharing cache never read
+        incomplete page. Cache is only an optimization, failure to store page
+        is counted in `self.errors` and reported with warning once.
+
+        Parameters
+        ----------
+        key : str
+            key of page obtained from `self.key`
+        content : str
+            `html` content of page
+        """
+        try:
+            write(self.locate(key), content)
+        except OSError as error:
+            if not self.errors:
+                warnings.warn(f"Cannot store page in cache: {error}")
+            self.errors += 1
+
+    def prune(self):
+        """Remove least recently used pages until cache fits its size."""
+        entries = []
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                pass
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.size:
+                break
+            try:
+                path.unlink()
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
 
 
-class Converter:
+class Compressor:
     """
-    Class responsible for `.md` files conversion to `.py`.
+    Write compressed copies of pages next to them in worker threads.
 
-    It preserves original directory structure.
+    Copy compressed with `gzip` gets `.gz` suffix, with `brotli` (used when
+    that module is installed) `.br` suffix, so static server can send them
+    without compressing pages itself. Compression releases GIL, so threads
+    work in parallel with rendering and writing other pages.
 
     ...
 
     Attributes
     ----------
-    path : pathlib.Path
-        project path leading to directory containing `.md` files to convert
-    files : list
-        containing paths to collected files
-    directories : list
-        containing paths to collected directories
+    formats : dict
+        suffix of compressed copy mapped to function compressing iterable of
+        `bytes` chunks, it yields compressed chunks
+    executor : concurrent.futures.ThreadPoolExecutor
+        pool of threads compressing pages
+    futures : list
+        pending compressions, each returns number of written bytes
+    pages : int
+        number of compressed pages
+    written : int
+        number of written bytes of compressed copies
     """
 
-    def __init__(self, path):
-        """Collect `.md` files and directories paths from set location."""
-        self.path = path
-        self.files = []
-        self.directories = []
-        self.collect(path)
+    SUFFIXES = (".gz", ".br")
+
+    def __init__(self, jobs=None):
+        """Find available compression formats and start threads.
+
+        Parameters
+        ----------
+        jobs : int or None, optional
+            number of compressing threads, `None` lets
+            `concurrent.futures.ThreadPoolExecutor` choose it (default is
+            `None`)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.formats = {".gz": self.gzip}
+        try:
+            import brotli  # noqa: F401
+            self.formats[".br"] = self.brotli
+        except ImportError:
+            pass
+        self.executor = ThreadPoolExecutor(jobs)
+        self.futures = []
+        self.pages = 0
+        self.written = 0
+
+    def __enter__(self):
+        """Return itself to be used as context manager."""
+        return self
 
-    def convert(self, directory):
-        """Convert all collected files from `.md` to `.py`.
+    def __exit__(self, *exception):
+        """Wait until all pages are compressed."""
+        self.close()
 
-        If file name is `README.md` change it to `__init__.py`. Each file is
-        saved to passed location preserving its relative path to project
-        directory.
+    def add(self, path, content, changed=True):
+        """Compress page in background unless its copies are up to date.
 
         Parameters
         ----------
-        directory : pathlib.Path
-            path to directory where converted files will be stored
+        path : pathlib.Path
+            path to page
+        content : str or Preformatted
+            page content, streamed one is compressed from written page
+        changed : bool, optional
+            information if page was written, otherwise it is compressed only
+            when some of its copies is missing (default is `True`)
         """
-        self.create_structure(directory)
-        for path in self.files:
-            if path.suffix == ".md":
-                if path.stem.upper() == "README":
-                    name = "__init__.py"
-                else:
-                    name = path.stem + ".py"
-                data = '"""\n' + load(path) + '\n"""'
-                path = directory / path.relative_to(self.path.parent).parent
-                save(path / name, data)
+        copies = [path.with_name(path.name + s) for s in self.formats]
+        if changed or not all(map(Path.exists, copies)):
+            future = self.executor.submit(self.compress, path, content)
+            self.futures.append(future)
 
-    def collect(self, directory):
-        """Collect all files from set directory.
+    def compress(self, path, content):
+        """Save compressed copies of page, return number of written bytes.
+
+        Streamed page is read back from its file in chunks, so it is never
+        held in memory as a whole.
+        """
+        written = 0
+        for suffix, compress in self.formats.items():
+            if isinstance(content, str):
+                chunks = [content.encode()]
+            else:
+                chunks = load_chunks(path)
+            written += write(path.with_name(path.name + suffix),
+                             compress(chunks))
+        return written
+
+    def close(self):
+        """Wait for pending compressions, errors raised by them are passed."""
+        self.executor.shutdown()
+        futures, self.futures = self.futures, []
+        for future in futures:
+            self.written += future.result()
+            self.pages += 1
+
+    @staticmethod
+    def gzip(chunks):
+        """Yield chunks compressed with `gzip` without timestamp in header."""
+        import gzip
+        import io
+
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as file:
+            for chunk in chunks:
+                file.write(chunk)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    @staticmethod
+    def brotli(chunks):
+        """Yield chunks compressed with `brotli`."""
+        import brotli
+
+        compressor = brotli.Compressor()
+        for chunk in chunks:
+            yield compressor.process(chunk)
+        yield compressor.finish()
+
+
+class Assets:
+    """
+    Move stylesheets and scripts shared by pages to separate files.
+
+    Each inline `<style>` and `<script>` block of page (not smaller than
+    `MINIMUM` characters) is replaced by link to file in `DIRECTORY` named
+    after hash of its content. Such file is created once for all pages and
+    never changes, so browser can cache it forever.
+
+    ...
+
+    Attributes
+    ----------
+    files : dict
+        name of each asset file used by pages mapped to its content
+    lock : threading.Lock
+        lock guarding `self.files` between writing threads
+    """
 
-        Iterate through files in set directory and place them in
-        `self.directories` or `self.files`. When folder is met call self again
-        with that path. In case of `PermissionError` skip that location.
+    DIRECTORY = "assets"
+    MINIMUM = 256
+    NAME = re.compile(r"[0-9a-f]{16}\.(?:css|js)")
+    PATTERN = re.compile(r'<(style|script)((?: media="[^"]*")?)>(.*?)</\1>',
+                         re.DOTALL)
+
+    def __init__(self):
+        """Start without any asset file."""
+        import threading
+
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def extract(self, page, content):
+        """Replace inline assets of page with links to their files.
 
         Parameters
         ----------
-        directory : pathlib.Path
-            directory from which paths will be collected
+        page : str
+            path to page relative to `html` notes directory
+        content : str or Preformatted
+            `html` content of page, head and tail of streamed one are changed
+
+        Returns
+        -------
+        tuple
+            containing page content and list of tuples with path relative to
+            `html` notes directory and content of each asset file which was
+            not returned before
         """
-        for path in directory.iterdir():
-            try:
-                if path.is_dir():
-                    self.directories.append(path)
-                    self.collect(path)
-                else:
-                    if path.suffix == ".md":
-                        self.files.append(path)
-            except PermissionError:
-                pass
+        if isinstance(content, Preformatted):
+            content.head, created = self.extract(page, content.head)
+            content.tail, more = self.extract(page, content.tail)
+            return content, created + more
+        prefix = "../" * page.count("/") + self.DIRECTORY + "/"
+        created = []
+
+        def replace(match):
+            tag, media, body = match.groups()
+            if len(body) < self.MINIMUM:
+                return match.group(0)
+            suffix = ".css" if tag == "style" else ".js"
+            name = digest(body)[:16] + suffix
+            with self.lock:
+                if name not in self.files:
+                    self.files[name] = body
+                    created.append((f"{self.DIRECTORY}/{name}", body))
+            if tag == "style":
+                return f'<link rel="stylesheet" href="{prefix}{name}"{media}>'
+            return f'<script src="{prefix}{name}"></script>'
+
+        return self.PATTERN.sub(replace, content), created
+
+
+class Index:
+    """
+    Full-text search index of notes prebuilt during conversion.
+
+    Each note is tokenized while it is converted. Inverted index is saved in
+    directory `DIRECTORY` next to `html` notes and split into shards by first
+    two characters of terms, so search page (`PAGE`) downloads only shards of
+    searched words. Each shard maps term to flat list of document number
+    (stored as difference from previous one) and number of occurrences.
+
+    ...
+
+    Attributes
+    ----------
+    documents : dict
+        module name of each note mapped to its title
+    terms : dict
+        term mapped to list of tuples with module name and number of its
+        occurrences in note
+    """
+
+    DIRECTORY = "search"
+    PAGE = "search.html"
+    TOKEN = re.compile(r"\w{2,32}")
+
+    def __init__(self):
+        """Create empty index."""
+        self.documents = {}
+        self.terms = {}
+
+    def add(self, name, content):
+        """Tokenize note content and add it to index.
+
+        Parameters
+        ----------
+        name : str
+            module name of note
+        content : str
+            note content
+        """
+        heading = re.search(r"^#+\s+(.+?)\s*#*$", content, re.MULTILINE)
+        title = name.rpartition(".")[2]
+        if heading:
+            title = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", heading.group(1))
+            title = title.strip("*_` ")
+        self.documents[name] = title
+        tokens = self.TOKEN.findall(content.lower())
+        for term, count in Counter(tokens).items():
+            self.terms.setdefault(term, []).append((name, count))
+
+    def shards(self, pages):
+        """Return content of index files.
+
+        Parameters
+        ----------
+        pages : dict
+            module name mapped to its page path relative to `html` notes
+            directory
+
+        Returns
+        -------
+        dict
+            file name mapped to its `json` content, documents are listed in
+            `documents.json` as pairs of page path and title
+        """
+        names = sorted(name for name in self.documents if name in pages)
+        numbers = {name: number for number, name in enumerate(names)}
+        documents = [[pages[name], self.documents[name]] for name in names]
+        shards = {}
+        for term in sorted(self.terms):
+            postings, previous = [], 0
+            for name, count in sorted(self.terms[term],
+                                      key=lambda p: numbers.get(p[0], -1)):
+                if name in numbers:
+                    postings += [numbers[name] - previous, count]
+                    previous = numbers[name]
+            if postings:
+                shards.setdefault(term[:2], {})[term] = postings
 
-    def create_structure(self, directory):
-        """Reproduce project directory structure in set location.
+        compact = dict(ensure_ascii=False, separators=(",", ":"))
+        files = {"documents.json": json.dumps(documents, **compact)}
+        for shard, terms in shards.items():
+            files[f"{shard}.json"] = json.dumps(terms, **compact)
+        return files
+
+    def save(self, directory, pages):
+        """Save index and search page in set directory.
+
+        Only changed files are written and shards of terms which are not
+        present anymore are deleted.
 
         Parameters
         ----------
         directory : pathlib.Path
-            path to directory where converted files will be stored
+            path to directory with `html` notes
+        pages : dict
+            module name mapped to its page path relative to `html` notes
+            directory
+
+        Returns
+        -------
+        int
+            number of written bytes
         """
-        self.create_directory(self.path, directory)
-        for path in self.directories:
-            self.create_directory(path, directory)
+        folder = directory / self.DIRECTORY
+        files = self.shards(pages)
+        written = write(directory / self.PAGE, search_page())
+        for file, content in files.items():
+            written += write(folder / file, content)
+        for path in folder.glob("*.json"):
+            if path.name not in files:
+                path.unlink()
+        return written
+
+
+def create_sitemap(base, pages) -> str:
+    """Return `sitemap.xml` content listing set pages.
+
+    Parameters
+    ----------
+    base : str
+        `url` under which `html` notes are hosted
+    pages : iterable
+        page paths relative to `html` notes directory
+
+    Returns
+    -------
+    str
+        sitemap in `xml` format
+    """
+    from urllib.parse import quote
+    from xml.sax.saxutils import escape
+
+    base = base.rstrip("/") + "/"
+    urls = [f"<url><loc>{escape(base + quote(page))}</loc></url>\n"
+            for page in pages]
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + "".join(urls) + "</urlset>\n")
+
+
+class Stats:
+    """
+    Class recording duration, number of pages, size of read and written data
+    and peak memory usage of each build stage.
 
-    def create_directory(self, path, destination):
-        """Reproduce directory from set path in destination.
+    ...
+
+    Attributes
+    ----------
+    stages : dict
+        stage name mapped to dict with its `time` in seconds, number of
+        `pages`, `read` and `written` bytes and peak `memory` in bytes (`None`
+        when platform does not provide it)
+    """
+
+    COLUMNS = (("time", "time [s]", 1), ("pages", "pages", 1),
+               ("read", "read [KiB]", 2 ** 10),
+               ("written", "written [KiB]", 2 ** 10),
+               ("memory", "peak memory [MiB]", 2 ** 20))
+
+    def __init__(self):
+        """Start without any recorded stage."""
+        self.stages = {}
+
+    def __str__(self):
+        """Return recorded stages as table."""
+        header = ["stage"] + [title for _, title, _ in self.COLUMNS]
+        rows = [header]
+        for name, stage in self.stages.items():
+            row = [name]
+            for key, _, unit in self.COLUMNS:
+                value = stage[key]
+                if value is None:
+                    row.append("-")
+                elif key == "time":
+                    row.append(f"{value:.3f}")
+                else:
+                    row.append(f"{value / unit:.0f}")
+            rows.append(row)
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        return "\n".join(
+            "  ".join([row[0].ljust(widths[0])]
+                      + [cell.rjust(width)
+                         for cell, width in zip(row[1:], widths[1:])])
+            for row in rows)
+
+    def add(self, stage, duration=0.0, pages=0, read=0, written=0):
+        """Add passed values to set stage, create it when needed.
 
         Parameters
         ----------
-        path : pathlib.Path
-            directory which will be reproduced
-        destination : pathlib.Path
-            location where to reproduce directory
+        stage : str
+            name of build stage
+        duration : float, optional
+            time in seconds (default is 0.0)
+        pages : int, optional
+            number of processed pages or notes (default is 0)
+        read : int, optional
+            number of read bytes (default is 0)
+        written : int, optional
+            number of written bytes (default is 0)
         """
-        path = destination / path.relative_to(self.path.parent)
-        path.mkdir(parents=True, exist_ok=True)
+        record = self.stages.setdefault(stage, {
+            "time": 0.0, "pages": 0, "read": 0, "written": 0, "memory": None})
+        record["time"] += duration
+        record["pages"] += pages
+        record["read"] += read
+        record["written"] += written
 
+    def sample(self, stage):
+        """Store current peak memory usage of process in set stage."""
+        self.add(stage)
+        if resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.stages[stage]["memory"] = peak * (
+                1 if sys.platform == "darwin" else 2 ** 10)
 
-class Notes:
+    @contextmanager
+    def measure(self, stage):
+        """Record duration and peak memory of code run inside block."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(stage, time.perf_counter() - start)
+            self.sample(stage)
+
+
+class Cancelled(Exception):
+    """Exception raised by `Progress` when build was cancelled."""
+
+
+class Progress:
     """
-    Class interacting with `pdoc` to create `html` notes.
+    Class reporting progress of build stages to set callback. Build can be
+    cancelled from other thread with `cancel`, then `Cancelled` is raised at
+    next reported event.
 
     ...
 
     Attributes
     ----------
-    destination : pathlib.Path
-        path to project directory where folder from `self.name` will be created
-    name : str, optional
-        name of directory where `html` files will be stored (default is "docs")
-    module : pdoc.Module
-        `pdoc` object representing module from which notes will be generated
+    callback : callable or None
+        function called with `self` after each event, `None` when events are
+        only recorded
+    stage : str or None
+        name of current build stage, `None` before build starts
+    total : int
+        number of pages processed in current stage
+    done : int
+        number of pages already processed in current stage
+    url : str or None
+        `url` of last processed page, `None` when stage just started
+    written : int
+        number of bytes written in current stage
+    start : float
+        time when current stage started, see `time.perf_counter`
+    cancelled : bool
+        information if build should stop
     """
 
-    def __init__(self, path, destination, name="docs", templates=None):
-        """Set notes templates. Initialize `pdoc` linker.
+    def __init__(self, callback=None):
+        """Start before any build stage.
 
         Parameters
         ----------
-        path : pathlib.Path
-            path to directory containing `.py` files with notes
-        templates : pathlib.Path or None, optional
-            path to directory containing customized templates which will be
-            used to create `html` notes (default is `None`)
+        callback : callable or None, optional
+            function called with `self` after each event, it is run by
+            thread building notes (default is `None`)
         """
-        self.destination = destination
-        self.name = name
-        self.set_templates(templates)
+        self.callback = callback
+        self.cancelled = False
+        self.stage = None
+        self.total = self.done = self.written = 0
+        self.url = None
+        self.start = time.perf_counter()
 
-        context = pdoc.Context()
-        source = str(path / destination.name)
-        self.module = pdoc.Module(source, context=context)
-        pdoc.link_inheritance(context)
+    @property
+    def elapsed(self):
+        """Return seconds elapsed since current stage started."""
+        return time.perf_counter() - self.start
 
-    def generate(self):
-        """Create `html` notes in `self.destination`/`self.name` directory."""
-        for path, content in self.get(self.module):
-            relative = "/".join(Path(path).parts[1:])
-            path = self.destination / self.name / relative
-            path.parent.mkdir(parents=True, exist_ok=True)
-            save(path, content)
+    @property
+    def rate(self):
+        """Return number of pages processed per second in current stage."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
 
-    def get(self, module):
-        """Obtain `url` and `html` content from set module and its submodules.
+    def begin(self, stage, total=0):
+        """Start set build stage and report it.
 
-        Paramters
-        ---------
-        module : pdoc.Module
-            object from which `url` and `html` content will be obtained, can
-            contain submodules
+        Parameters
+        ----------
+        stage : str or None
+            name of build stage
+        total : int, optional
+            number of pages processed in stage (default is 0)
+        """
+        self.stage = stage
+        self.total = total
+        self.done = 0
+        self.url = None
+        self.written = 0
+        self.start = time.perf_counter()
+        self.report()
 
-        Yields
+    def step(self, url, written=0):
+        """Report that page was processed.
+
+        Parameters
+        ----------
+        url : str
+            `url` of processed page
+        written : int, optional
+            number of bytes written for page (default is 0)
+        """
+        self.done += 1
+        self.url = url
+        self.written += written
+        self.report()
+
+    def report(self):
+        """Pass event to callback then stop build if it was cancelled.
+
+        Raises
         ------
-        tuple
-            containing module `url` and its `html` content
+        Cancelled
+            if `cancel` was called
         """
-        yield module.url(), module.html()
-        for submodule in module.submodules():
-            yield from self.get(submodule)
+        if self.callback is not None:
+            self.callback(self)
+        if self.cancelled:
+            raise Cancelled("Build cancelled")
 
-    def set_templates(self, directory):
-        """Set `pdoc` templates according to available options.
+    def cancel(self):
+        """Stop build at next reported event, any thread can call it."""
+        self.cancelled = True
 
-        When passed path contains templates then they are used. If not folder
-        `templates` in `self.destination` is checked. If still nothing is
-        found templates from installation directory are taken. If it could not
-        find them anywhere it does not modify anything - templates provided
-        with `pdoc` are used.
+
+class Manifest:
+    """
+    Class keeping information about previous build to make incremental ones.
+
+    Manifest is stored as `json` file inside directory with `html` notes. It
+    holds hash of used templates and for each note hash of its content, path
+    to its page and links it contains. Together with module tree it forms
+    dependency graph of pages. When templates did not change only pages of
+    modified or added notes, index pages of parent directories of added,
+    removed or moved notes (their navigation lists children, not content) and
+    pages which links point somewhere else are created again.
+
+    ...
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        path to manifest file
+    templates : str or None
+        hash of templates used in previous build, `None` when unknown
+    notes : dict
+        module name of each note mapped to dict with its content `hash`,
+        `page` path relative to `html` notes directory and `links` (name
+        mapped to `url` of linked object), directories without `README.md`
+        have empty `hash`
+    removed : list
+        pages of previous builds which are not created anymore, they are
+        kept in manifest until `clean` deletes them
+    reasons : dict
+        module name of each page which needs to be created mapped to list of
+        reasons why
+    state : str or None
+        fingerprint of files previous build depended on, see `fingerprint`,
+        `None` when unknown
+    assets : list
+        names of files in `Assets.DIRECTORY` which pages link to
+    dependencies : list
+        paths to files used by preprocessors of notes, see `Preprocessor`
+    """
+
+    NAME = ".mdnotes.json"
+
+    def __init__(self, directory):
+        """Load manifest from set directory. If it is missing start empty.
 
         Parameters
         ----------
-        directory : pathlib.Path or None
-            path to directory containing templates, `None` when not specified
+        directory : pathlib.Path
+            path to directory where `html` notes are stored
         """
-        destination = self.destination / "templates"
-        module_dir = getattr(sys, "_MEIPASS", Path(__file__).parent.absolute())
-        module = Path(module_dir) / "templates"
-        for path in (directory, destination, module):
-            if self.change_templates(path):
-                break
+        self.path = directory / self.NAME
+        self.templates = None
+        self.notes = {}
+        self.removed = []
+        self.reasons = {}
+        self.state = None
+        self.assets = []
+        self.dependencies = []
+        try:
+            data = json.loads(load(self.path))
+            self.templates = data["templates"]
+            self.notes = data["notes"]
+            self.state = data.get("state")
+            self.removed = data.get("removed", [])
+            self.assets = data.get("assets", [])
+            self.dependencies = data.get("dependencies", [])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
 
-    def change_templates(self, path):
-        """Change `pdoc` templates if set `path` contains all necessary files.
+    def is_current(self, state):
+        """Check if previous build is up to date and none of its pages is gone.
 
         Parameters
         ----------
-        path : pathlib.Path or None
-            path to directory containing templates, `None` when not specified
+        state : str
+            fingerprint of files current build depends on
 
         Returns
         -------
         bool
-            information if templates were changed or not
+            information if there is nothing to create
         """
-        if self.has_templates(path):
-            pdoc.tpl_lookup.directories = [str(path)]
-            return True
-        return False
+        directory = self.path.parent
+        pages = (directory / note["page"] for note in self.notes.values())
+        return (state == self.state and all(map(Path.exists, pages))
+                and self.has_assets())
 
-    @staticmethod
-    def has_templates(directory):
-        """Check if templates files are stored in set `directory`.
+    def has_assets(self):
+        """Check if all asset files of previous build exist."""
+        directory = self.path.parent / Assets.DIRECTORY
+        return all((directory / name).exists() for name in self.assets)
+
+    def update(self, converter, notes, suffixes=(), assets=False):
+        """Store state of current build and find pages to create again.
+
+        Reasons of creating each page are stored in `self.reasons`.
 
         Parameters
         ----------
-        directory : pathlib.Path
-            path to directory which will be checked if templates are there
+        converter : Converter
+            object which converted notes of current build
+        notes : Notes
+            object holding module tree and templates of current build
+        suffixes : iterable, optional
+            suffixes of copies which each page should have, page is created
+            again when any of them is missing (default is `()`)
+        assets : bool, optional
+            information if pages link to files created by `Assets`, all pages
+            are created again when it changes or any of these files is
+            missing (default is `False`)
 
         Returns
         -------
-        bool
-            information if folder contains templates or not
+        set or None
+            names of modules which pages need to be created, `None` when all
+            of them should be created
         """
-        templates = ("config", "credits", "css", "head", "html", "logo")
+        previous, self.notes = self.notes, {}
+        for module in notes.walk(notes.module):
+            content = converter.hashes.get(module.name, "")
+            page = notes.relative(module.url())
+            links = notes.links(module, converter.links.get(module.name, ()))
+            self.notes[module.name] = {"hash": content, "page": page,
+                                       "links": links}
+        pages = {note["page"] for note in self.notes.values()}
+        removed = {note["page"] for note in previous.values()}
+        self.removed = sorted(removed.union(self.removed) - pages)
+
+        self.reasons = {}
+        templates = notes.templates_hash()
+        if assets:
+            templates = digest(templates + Assets.DIRECTORY)
+        reason = None
+        if self.templates is None and not previous:
+            reason = "no previous build manifest"
+        elif templates != self.templates:
+            reason = "templates changed"
+        elif not self.has_assets():
+            reason = "asset file missing"
+        if reason:
+            self.templates = templates
+            for name in self.notes:
+                self.explain(name, reason)
+            return None
+
+        for name in previous.keys() - self.notes.keys():
+            self.explain(name.rpartition(".")[0], f"{name} removed")
+        for name, note in self.notes.items():
+            parent = name.rpartition(".")[0]
+            old = previous.get(name)
+            if old is None:
+                self.explain(name, "new note")
+                self.explain(parent, f"{name} added")
+                continue
+            if old["hash"] != note["hash"]:
+                self.explain(name, "content changed")
+            if old["page"] != note["page"]:
+                self.explain(name, "page moved")
+                self.explain(parent, f"{name} moved")
+            links = old.get("links", {})
+            for link in sorted(links.keys() | note["links"].keys()):
+                if links.get(link) != note["links"].get(link):
+                    self.explain(name, f"link `{link}` changed")
+            page = self.path.parent / note["page"]
+            copies = [page.with_name(page.name + s) for s in suffixes]
+            if not all(map(Path.exists, [page, *copies])):
+                self.explain(name, "page missing")
+        return set(self.reasons)
+
+    def explain(self, name, reason):
+        """Add reason of creating page of module with set name.
+
+        Modules missing in current build (e.g. parent of root) are ignored.
+
+        Parameters
+        ----------
+        name : str
+            module name
+        reason : str
+            description why page is created
+        """
+        if name in self.notes:
+            self.reasons.setdefault(name, []).append(reason)
+
+    def clean(self):
+        """Delete pages from `self.removed` and directories left empty.
+
+        Compressed copies of pages saved by `Compressor` are deleted as well,
+        so are asset files created by `Assets` which are not in `self.assets`.
+        Deleted pages are no longer listed in `self.removed`.
+        """
+        directory = self.path.parent
+        assets = directory / Assets.DIRECTORY
+        if assets.is_dir():
+            for path in assets.iterdir():
+                name = path.name
+                if name.endswith(Compressor.SUFFIXES):
+                    name = name.rpartition(".")[0]
+                if Assets.NAME.fullmatch(name) and name not in self.assets:
+                    path.unlink()
+            if not any(assets.iterdir()):
+                assets.rmdir()
+        for page in self.removed:
+            path = directory / page
+            for suffix in Compressor.SUFFIXES:
+                copy = path.with_name(path.name + suffix)
+                if copy.exists():
+                    copy.unlink()
+            try:
+                path.unlink()
+                for parent in path.relative_to(directory).parents:
+                    if parent != Path():
+                        (directory / parent).rmdir()
+            except OSError:
+                pass
+        self.removed = []
+
+    def save(self):
+        """Save manifest to its file."""
+        data = {"templates": self.templates, "notes": self.notes,
+                "state": self.state, "removed": self.removed,
+                "assets": self.assets,
+                "dependencies": self.dependencies}
+        write(self.path, json.dumps(data, indent=1, sort_keys=True))
+
+
+def receiver(sink):
+    """Return function passing page to set sink.
+
+    Parameters
+    ----------
+    sink : pathlib.Path, dict, archive, callable or None
+        directory where pages are written (only changed ones), mapping where
+        they are stored, open `zipfile.ZipFile` or `tarfile.TarFile` where
+        they are added (also streamed one), function called
+        with page `url` and `html` content or `None` when pages are only
+        yielded. Streamed pages (see `Preformatted`) are written in chunks
+        to directory and archives (`tar` one spools them to temporary file
+        to know their size), other sinks receive them as they are
+
+    Returns
+    -------
+    callable
+        function accepting page `url` and its `html` content
+    """
+    if sink is None:
+        return lambda url, html: None
+    if isinstance(sink, Path):
+        return lambda url, html: write(sink / url, html)
+    if hasattr(sink, "writestr"):
+        from zipfile import ZIP_DEFLATED, ZipInfo
+
+        def store(url, html):
+            info = ZipInfo(url, (1980, 1, 1, 0, 0, 0))
+            info.external_attr = 0o644 << 16
+            if isinstance(html, str):
+                sink.writestr(info, html, ZIP_DEFLATED)
+                return
+            info.compress_type = ZIP_DEFLATED
+            with sink.open(info, "w") as file:
+                for chunk in html:
+                    file.write(chunk)
+        return store
+    if hasattr(sink, "addfile"):
+        import io
+        from tarfile import TarInfo
+        import tempfile
+
+        def add(url, html):
+            info = TarInfo(url)
+            info.mode = 0o644
+            if isinstance(html, str):
+                data = html.encode()
+                info.size = len(data)
+                sink.addfile(info, io.BytesIO(data))
+                return
+            with tempfile.SpooledTemporaryFile(2 ** 20) as file:
+                for chunk in html:
+                    file.write(chunk)
+                info.size = file.tell()
+                file.seek(0)
+                sink.addfile(info, file)
+        return add
+    if hasattr(sink, "__setitem__"):
+        return sink.__setitem__
+    return sink
+
+
+@contextmanager
+def archive(path: Path):
+    """Open archive in set path for writing pages one by one.
+
+    Format is chosen by file suffix: `.zip`, `.tar`, `.tar.gz` (`.tgz`),
+    `.tar.bz2`, `.tar.xz` or `.tar.zst` (needs `zstandard` module). Tar
+    archives are written as stream, so nothing is buffered in memory. Archive
+    is created in temporary file which replaces set one when it is closed
+    without errors.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to created archive
+
+    Yields
+    ------
+    zipfile.ZipFile or tarfile.TarFile
+        open archive which can be used as `build` sink
+
+    Raises
+    ------
+    ValueError
+        if suffix of set path is not supported or module needed to write
+        archive is not installed
+    """
+    import tarfile
+    import zipfile
+
+    name = path.name.lower()
+    modes = {".tar": "w|", ".tar.gz": "w|gz", ".tgz": "w|gz",
+             ".tar.bz2": "w|bz2", ".tar.xz": "w|xz", ".tar.zst": "w|"}
+    suffix = next((s for s in modes if name.endswith(s)), None)
+    if suffix is None and not name.endswith(".zip"):
+        raise ValueError(f"Unsupported archive format: {path.name}")
+    if suffix == ".tar.zst":
         try:
-            files = set(path.name for path in directory.iterdir())
-            expected = set(f"{name}.mako" for name in templates)
-            return not expected - files
-        except ACCESS_ERRORS:
-            return False
+            import zstandard
+        except ImportError:
+            raise ValueError("Module zstandard is needed for .tar.zst "
+                             "archive, install it with: pip install "
+                             "zstandard")
+
+    temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp, "wb") as file:
+            if suffix is None:
+                with zipfile.ZipFile(file, "w") as output:
+                    yield output
+            elif suffix == ".tar.zst":
+                compressor = zstandard.ZstdCompressor()
+                with compressor.stream_writer(file, closefd=False) as stream:
+                    with tarfile.open(fileobj=stream, mode="w|") as output:
+                        yield output
+            else:
+                with tarfile.open(fileobj=file, mode=modes[suffix]) as output:
+                    yield output
+        os.replace(temp, path)
+    finally:
+        if temp.exists():
+            temp.unlink()
 
 
-def main(path, *args, **kwargs):
+def build(path, sink=None, templates=None, jobs=1, exclude=(), cache=None,
+          stream=False, limit=LIMIT, assets=False, preprocessors=()):
+    """Create pages of notes and pass them to set sink one by one.
+
+    Unlike `main` nothing is written unless sink does it and no manifest is
+    used, all pages are created. Pages are rendered lazily, next one only
+    when previous was consumed, so they can be streamed e.g. into archive
+    without intermediate files.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    sink : pathlib.Path, dict, archive, callable or None, optional
+        receiver of pages, see `receiver` (default is `None`)
+    templates : pathlib.Path or None, optional
+        path to directory with customized templates (default is `None`)
+    jobs : int, optional
+        number of processes rendering pages, all available processors are
+        used when lower than 1 (default is 1)
+    exclude : iterable, optional
+        glob patterns of files and directories to skip (default is `()`)
+    cache : Cache or None, optional
+        cache of rendered pages shared between builds (default is `None`)
+    stream : bool, optional
+        keep only module tree in memory, note content is read right before
+        its page is rendered (default is `False`)
+    limit : int, optional
+        size in bytes above which note is shown as preformatted text
+        (default is `LIMIT`)
+    assets : bool, optional
+        pass stylesheets and scripts shared by pages once as separate files,
+        see `Assets` (default is `False`)
+    preprocessors : iterable or Preprocessing, optional
+        objects changing content of each note before it is converted, see
+        `Preprocessor` (default is `()`)
+
+    Yields
+    ------
+    tuple
+        containing page `url` relative to notes root and its `html` content
+        (`Preformatted` for raw note), asset file is yielded right after
+        first page using it
+    """
+    send = receiver(sink)
+    converter = Converter(path, exclude, limit, preprocessors)
+    notes = Notes(converter, templates=templates, cache=cache, stream=stream)
+    shared = Assets() if assets else None
+    for url, html in notes.render(jobs=jobs):
+        files = [(notes.relative(url), html)]
+        if shared is not None:
+            html, created = shared.extract(files[0][0], html)
+            files = [(files[0][0], html), *created]
+        for url, html in files:
+            send(url, html)
+            yield url, html
+
+
+def main(path, name="docs", templates=None, force=False, jobs=1, exclude=(),
+         cache=None, clean=False, atomic=False, stats=None, profile=None,
+         stream=False, search=False, precompress=False, explain=False,
+         limit=LIMIT, progress=None, assets=False, sitemap=None,
+         navigation=False, preprocessors=(), converter=None):
     """Generate notes in `html` format.
 
-    Create `tempfile.TemporaryDirectory`. Then convert `.md` files from set
-    path to `.py` and store them in that directory. Finally generate `html`
-    notes from those files.
+    Collect `.md` files from set path and convert them to `Note` objects.
+    Then generate `html` notes from them. Only pages changed since previous
+    build are created, unless `force` is set. When `fingerprint` of notes and
+    templates matches previous build nothing is converted, so `pdoc` is not
+    even imported.
 
     Parameters
     ----------
     path : pathlib.Path
         path to directory with notes
-    *args
-        optional arguments passed to `Notes` class
-    """
-    with TemporaryDirectory() as temp_dir:
-        temp = Path(temp_dir)
-        converter = Converter(path)
-        converter.convert(temp)
-        notes = Notes(temp, path, *args, **kwargs)
-        notes.generate()
+    name : str, optional
+        name of directory where `html` notes will be saved (default is
+        "docs")
+    templates : pathlib.Path or None, optional
+        path to directory with customized templates (default is `None`)
+    force : bool, optional
+        create all pages ignoring previous build manifest (default is `False`)
+    jobs : int, optional
+        number of processes rendering pages, all available processors are
+        used when lower than 1 (default is 1)
+    exclude : iterable, optional
+        glob patterns of files and directories to skip (default is `()`)
+    cache : Cache or None, optional
+        cache of rendered pages shared between builds, it is pruned after
+        notes are created (default is `None`)
+    clean : bool, optional
+        delete pages of notes removed since any previous build which were not
+        deleted yet, see `Manifest.removed` (default is `False`)
+    atomic : bool, optional
+        create notes in sibling staging directory which replaces `html` notes
+        directory when build succeeds (default is `False`)
+    stats : Stats or None, optional
+        object recording duration and size of each build stage, `None` when
+        nothing is recorded (default is `None`)
+    profile : pathlib.Path or None, optional
+        path to file where `cProfile` statistics of rendering and writing
+        pages are saved (default is `None`)
+    stream : bool, optional
+        keep only module tree in memory, note content is read right before
+        its page is rendered and released once page is written (default is
+        `False`)
+    search : bool, optional
+        save full-text search index of notes with search page, see `Index`
+        (default is `False`)
+    precompress : bool, optional
+        save compressed copies of written pages, see `Compressor` (default is
+        `False`)
+    explain : bool, optional
+        print why each page is created (default is `False`)
+    limit : int, optional
+        size in bytes above which note is shown as preformatted text
+        (default is `LIMIT`)
+    progress : Progress or None, optional
+        object notified when each stage starts and each page is saved, it
+        allows to cancel build (default is `None`)
+    assets : bool, optional
+        save stylesheets and scripts shared by pages once as separate files,
+        see `Assets` (default is `False`)
+    sitemap : str or None, optional
+        `url` under which notes are hosted, when set `sitemap.xml` listing
+        all pages is saved (default is `None`)
+    navigation : bool, optional
+        save navigation structure of all pages (see `Notes.navigation`) as
+        `navigation.json` file (default is `False`)
+    preprocessors : iterable or Preprocessing, optional
+        objects changing content of each note before it is converted, see
+        `Preprocessor`, files they use are tracked as notes (default is `()`)
+    converter : Converter or None, optional
+        object which collected notes in previous build of set path, it is
+        refreshed and reads again only changed notes, `exclude`, `limit` and
+        `preprocessors` are then taken from it (default is `None`, new one is
+        created)
+
+    Raises
+    ------
+    Cancelled
+        if build was cancelled with `progress`, with `atomic` set notes
+        directory then stays untouched
+    """
+    measure = nullcontext if stats is None else stats.measure
+    if progress is not None:
+        progress.begin("collect")
+    with measure("collect"):
+        if converter is None:
+            converter = Converter(path, exclude, limit, preprocessors)
+        else:
+            converter.refresh()
+        previous = Manifest(path / name)
+        options = {"search": search, "precompress": precompress,
+                   "limit": converter.limit, "assets": assets,
+                   "sitemap": sitemap, "navigation": navigation,
+                   "preprocessors": [p.key()
+                                     for p in converter.preprocessing]}
+        inputs = [*converter.files, *map(Path, previous.dependencies)]
+        state = fingerprint(inputs, find_templates(templates, path), options)
+    if stats is not None:
+        stats.add("collect", pages=len(converter.files))
+    if not force and previous.is_current(state):
+        if explain:
+            print("Nothing to create, notes and templates did not change")
+        if clean and previous.removed:
+            previous.clean()
+            previous.save()
+        return
+
+    if progress is not None:
+        progress.begin("convert", len(converter.files))
+    with measure("convert"):
+        index = Index() if search else None
+        notes = Notes(converter, name, templates, cache, stream, index)
+    if stats is not None:
+        stats.add("convert", pages=len(converter.files),
+                  read=sum(os.path.getsize(p) for p in converter.files))
+
+    output = notes.destination / notes.name
+    with staged(output) if atomic else nullcontext(output) as directory, \
+            Compressor() if precompress else nullcontext() as compressor:
+        with measure("manifest"):
+            manifest = Manifest(directory)
+            suffixes = compressor.formats if compressor else ()
+            names = manifest.update(converter, notes, suffixes, assets)
+            if force:
+                names = None
+        if explain:
+            for module, note in manifest.notes.items():
+                reasons = ["forced"] if force else manifest.reasons.get(module)
+                if reasons:
+                    print(f"{note['page']}: {', '.join(reasons)}")
+        profiler = None
+        if profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+        if progress is not None:
+            progress.begin("render", len(manifest.notes if names is None
+                                         else names))
+        shared = Assets() if assets else None
+        notes.generate(names, jobs, directory, stats, compressor, progress,
+                       shared)
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if compressor is not None:
+            with measure("compress"):
+                compressor.close()
+            if stats is not None:
+                stats.add("compress", pages=compressor.pages,
+                          written=compressor.written)
+        if index is not None:
+            with measure("search"):
+                pages = {n: note["page"] for n, note in manifest.notes.items()}
+                written = index.save(directory, pages)
+            if stats is not None:
+                stats.add("search", pages=len(index.documents),
+                          written=written)
+        if sitemap is not None or navigation:
+            with measure("navigation"):
+                pages = notes.navigation()
+                files = {}
+                if sitemap is not None:
+                    files["sitemap.xml"] = create_sitemap(sitemap, pages)
+                if navigation:
+                    files["navigation.json"] = json.dumps(pages, indent=1)
+                written = sum(write(directory / n, content)
+                              for n, content in files.items())
+            if stats is not None:
+                stats.add("navigation", pages=len(pages), written=written)
+        if progress is not None:
+            progress.begin("finish")
+        with measure("finish"):
+            if shared is None:
+                manifest.assets = []
+            elif names is None:
+                manifest.assets = sorted(shared.files)
+            else:
+                assets = set(manifest.assets).union(shared.files)
+                manifest.assets = sorted(assets)
+            if clean:
+                manifest.clean()
+            manifest.dependencies = sorted(
+                {str(path) for used in converter.dependencies.values()
+                 for path in used})
+            manifest.state = state
+            manifest.save()
+    if cache is not None:
+        cache.prune()
+    converter.preprocessing.prune()
 
 
 if __name__ == "__main__":
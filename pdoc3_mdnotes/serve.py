@@ -0,0 +1,350 @@
+"""#### Serve
+
+Module runs local HTTP server which renders notes on demand, so they can be
+previewed without creating whole `html` notes directory. `Preview` keeps
+module tree of notes and holds rendered pages in LRU cache. Cached page is
+valid as long as modification times of its note, its directory and templates
+did not change. Responses contain `ETag` and `Last-Modified` headers, so
+browser can revalidate pages cheaply. Files which are not pages are served
+from `html` notes directory. Modules used: `collections`, `email`, `hashlib`,
+`http.server`, `os`, `threading`, `urllib`, `pdoc` and
+`pdoc3_mdnotes.mdnotes`.
+
+
+#### License
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+from urllib.parse import unquote, urlsplit
+
+import pdoc
+
+from pdoc3_mdnotes import mdnotes
+
+
+class Page:
+    """
+    Rendered page stored in `Preview` cache.
+
+    ...
+
+    Attributes
+    ----------
+    signature : tuple
+        modification times of files page was rendered from
+    content : bytes
+        encoded `html` content of page
+    etag : str
+        quoted hash of `self.content`
+    modified : int
+        latest modification time from `self.signature` in seconds
+    """
+
+    def __init__(self, signature, html):
+        """Encode page content and compute its validators.
+
+        Parameters
+        ----------
+        signature : tuple
+            modification times of files page was rendered from
+        html : str or pdoc3_mdnotes.mdnotes.Preformatted
+            rendered page content
+        """
+        self.signature = signature
+        self.content = str(html).encode()
+        self.etag = '"' + hashlib.sha1(self.content).hexdigest() + '"'
+        self.modified = max(filter(None, signature), default=0) // 10 ** 9
+
+
+class Preview:
+    """
+    Render pages of notes on demand and keep them in LRU cache.
+
+    ...
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    templates : pathlib.Path or None
+        path to directory with customized templates, `None` when not set
+    exclude : iterable
+        glob patterns of files and directories skipped in notes directory
+    preprocessors : iterable
+        objects changing content of each note before it is converted
+    size : int
+        maximal number of pages kept in cache
+    cache : collections.OrderedDict
+        page path relative to `html` notes directory mapped to `Page` object,
+        least recently used first
+    converter : pdoc3_mdnotes.mdnotes.Converter
+        object which collected notes, it keeps files used by preprocessors
+        and is reused when notes are loaded again
+    notes : pdoc3_mdnotes.mdnotes.Notes
+        object holding module tree of notes
+    pages : dict
+        page path relative to `html` notes directory mapped to its module
+    signatures : dict
+        page path relative to `html` notes directory mapped to modification
+        times of its files when notes were loaded
+    lock : threading.Lock
+        lock guarding module tree and cache between request threads
+    """
+
+    def __init__(self, path, templates=None, exclude=(), size=256,
+                 preprocessors=()):
+        """Load notes from set path.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            path to directory with notes
+        templates : pathlib.Path or None, optional
+            path to directory with customized templates (default is `None`)
+        exclude : iterable, optional
+            glob patterns of files and directories to skip (default is `()`)
+        size : int, optional
+            maximal number of pages kept in cache (default is 256)
+        preprocessors : iterable, optional
+            objects changing content of each note before it is converted, see
+            `pdoc3_mdnotes.mdnotes.Preprocessor` (default is `()`)
+        """
+        self.path = path
+        self.templates = templates
+        self.exclude = exclude
+        self.preprocessors = preprocessors
+        self.size = size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.converter = None
+        self.load()
+
+    def load(self):
+        """Convert notes creating module tree again.
+
+        Files are collected again only when any scanned directory changed,
+        unchanged notes are not read again, see
+        `pdoc3_mdnotes.mdnotes.Converter.refresh`.
+        """
+        if self.converter is None:
+            self.converter = mdnotes.Converter(
+                self.path, self.exclude, preprocessors=self.preprocessors)
+        else:
+            self.converter.refresh()
+        self.notes = mdnotes.Notes(self.converter, templates=self.templates)
+        self.pages = {self.notes.relative(module.url()): module
+                      for module in self.notes.walk(self.notes.module)}
+        self.signatures = {page: self.signature(module)
+                           for page, module in self.pages.items()}
+
+    def signature(self, module):
+        """Return modification times of files used to render set module.
+
+        Parameters
+        ----------
+        module : pdoc.Module
+            module which page is rendered
+
+        Returns
+        -------
+        tuple
+            modification times (`None` when file is missing) of note, its
+            directory, templates and files used by preprocessors
+        """
+        note = getattr(module.obj, '__file__', None)
+        directory = self.path.parent.joinpath(*module.name.split('.'))
+        if not module.is_package:
+            directory = directory.parent
+        templates = [os.path.join(folder, name)
+                     for folder in pdoc.tpl_lookup.directories
+                     for name in sorted(os.listdir(folder))]
+        used = sorted(self.converter.dependencies.get(module.name, ()))
+        return tuple(mtime(path)
+                     for path in [note, directory, *templates, *used])
+
+    def get(self, page):
+        """Return rendered page from cache or render it again when outdated.
+
+        When files page depends on changed since notes were loaded, module
+        tree is created again. Unknown page is looked for in created tree only
+        when any notes directory changed, otherwise it is not a note (e.g.
+        asset or search index) and `None` is returned right away.
+
+        Parameters
+        ----------
+        page : str
+            page path relative to `html` notes directory
+
+        Returns
+        -------
+        Page or None
+            rendered page, `None` when notes do not contain such page
+        """
+        with self.lock:
+            module = self.pages.get(page)
+            signature = module and self.signature(module)
+            if not module and not self.converter.refresh():
+                return None
+            if not module or signature != self.signatures[page]:
+                self.load()
+                module = self.pages.get(page)
+                if module is None:
+                    return None
+                signature = self.signatures[page]
+
+            cached = self.cache.get(page)
+            if cached is None or cached.signature != signature:
+                cached = Page(signature, self.notes.html(module))
+                self.cache[page] = cached
+            self.cache.move_to_end(page)
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+            return cached
+
+
+def mtime(path):
+    """Return modification time of file located in set path or `None`."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """
+    Request handler serving pages from `Preview` object. It extends
+    `http.server.SimpleHTTPRequestHandler` which serves other files.
+
+    ...
+
+    Attributes
+    ----------
+    preview : Preview
+        object rendering pages, set on subclass created by `main` function
+    """
+
+    preview = None
+
+    def do_GET(self):
+        """Send rendered page or fall back to file from notes directory."""
+        if not self.send_page(head=False):
+            super().do_GET()
+
+    def do_HEAD(self):
+        """Send headers of rendered page or of file from notes directory."""
+        if not self.send_page(head=True):
+            super().do_HEAD()
+
+    def send_page(self, head):
+        """Send page matching request path if notes contain it.
+
+        Parameters
+        ----------
+        head : bool
+            information if only headers should be sent
+
+        Returns
+        -------
+        bool
+            information if request was handled
+        """
+        page = unquote(urlsplit(self.path).path).lstrip('/')
+        if not page or page.endswith('/'):
+            page += 'index.html'
+        page = self.preview.get(page)
+        if page is None:
+            return False
+
+        if self.is_fresh(page):
+            self.send_response(304)
+            self.send_validators(page)
+            self.end_headers()
+            return True
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page.content)))
+        self.send_validators(page)
+        self.end_headers()
+        if not head:
+            self.wfile.write(page.content)
+        return True
+
+    def is_fresh(self, page):
+        """Check if page cached by browser is still valid.
+
+        Parameters
+        ----------
+        page : Page
+            requested page
+
+        Returns
+        -------
+        bool
+            information if browser can use its cached copy
+        """
+        etag = self.headers.get('If-None-Match')
+        if etag is not None:
+            return page.etag in (tag.strip() for tag in etag.split(','))
+        since = self.headers.get('If-Modified-Since')
+        try:
+            return parsedate_to_datetime(since).timestamp() >= page.modified
+        except (TypeError, ValueError):
+            return False
+
+    def send_validators(self, page):
+        """Send caching headers of set page."""
+        self.send_header('ETag', page.etag)
+        self.send_header('Last-Modified', formatdate(page.modified,
+                                                     usegmt=True))
+        self.send_header('Cache-Control', 'no-cache')
+
+
+def main(path, name='docs', templates=None, port=8000, exclude=(),
+         preprocessors=()):
+    """Run HTTP server previewing notes until it is interrupted.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    name : str, optional
+        name of directory with `html` notes from which other files are served
+        (default is "docs")
+    templates : pathlib.Path or None, optional
+        path to directory with customized templates (default is `None`)
+    port : int, optional
+        port on which server listens (default is 8000)
+    exclude : iterable, optional
+        glob patterns of files and directories to skip (default is `()`)
+    preprocessors : iterable, optional
+        objects changing content of each note before it is converted (default
+        is `()`)
+    """
+    preview = Preview(path, templates, exclude,
+                      preprocessors=preprocessors)
+    handler = type('Handler', (Handler,), {'preview': preview})
+    directory = str(path / name)
+
+    def create(*args):
+        return handler(*args, directory=directory)
+
+    with ThreadingHTTPServer(('localhost', port), create) as server:
+        print(f'Serving notes on http://localhost:{port}/, '
+              'press Ctrl+C to stop', flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,208 @@
+"""#### Watch
+
+Module keeps program running after first build and creates `html` notes again
+whenever notes or templates change. `Watcher` polls modification times of
+collected `.md` files, their directories and templates, so it works on any
+platform without additional dependencies and never walks whole tree while
+waiting. Rapid successive saves are batched into one build. Incremental
+builds (see `pdoc3_mdnotes.mdnotes.Manifest`) ensure that only affected
+pages are created again, while `pdoc`, compiled templates and converter
+with content of unchanged notes stay loaded in memory. Modules used: `os`,
+`time` and `pdoc3_mdnotes.mdnotes`.
+
+
+#### License
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import time
+
+from pdoc3_mdnotes import mdnotes
+
+
+class Watcher:
+    """
+    Poll notes directory and create `html` notes when something changes.
+
+    ...
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    templates : pathlib.Path or None
+        path to directory with customized templates, `None` when not set
+    interval : float
+        seconds between consecutive checks
+    delay : float
+        seconds without any change needed before build starts
+    options : dict
+        keyword arguments passed to `pdoc3_mdnotes.mdnotes.main`
+    converter : pdoc3_mdnotes.mdnotes.Converter
+        object collecting notes kept between builds, so only changed notes
+        are read again
+    dependencies : list
+        paths to files used by preprocessors in previous build
+    output : pathlib.Path
+        path to directory with `html` notes, changes inside are not watched
+    """
+
+    def __init__(self, path, name='docs', templates=None,
+                 interval=1.0, delay=0.5, **options):
+        """Set watched directory and build options.
+
+        Parameters
+        ----------
+        path : pathlib.Path
+            path to directory with notes
+        name : str, optional
+            name of directory where `html` notes will be saved (default is
+            "docs")
+        templates : pathlib.Path or None, optional
+            path to directory with customized templates (default is `None`)
+        interval : float, optional
+            seconds between consecutive checks (default is 1.0)
+        delay : float, optional
+            seconds without any change needed before build starts (default
+            is 0.5)
+        **options
+            keyword arguments passed to `pdoc3_mdnotes.mdnotes.main`
+        """
+        self.path = path
+        self.templates = templates
+        self.interval = interval
+        self.delay = delay
+        self.options = dict(options, name=name, templates=templates)
+        self.converter = mdnotes.Converter(
+            path, options.get('exclude', ()),
+            options.get('limit', mdnotes.LIMIT),
+            options.get('preprocessors', ()))
+        self.dependencies = []
+        self.output = path / name
+
+    def snapshot(self):
+        """Return modification state of watched files.
+
+        Returns
+        -------
+        dict
+            path of each collected `.md` file, scanned directory, template
+            and file used by preprocessors in previous build mapped to tuple
+            with its modification time and size
+        """
+        scanned = [path for path in self.converter.scanned
+                   if not self.is_output(path)]
+        paths = [*self.converter.files, *scanned, *self.dependencies]
+        for directory in (self.templates, self.path / 'templates'):
+            if directory is not None and directory.is_dir():
+                paths.extend(directory.glob('*.mako'))
+
+        state = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return state
+
+    def wait(self, state):
+        """Block until watched files change and stop changing.
+
+        Parameters
+        ----------
+        state : dict
+            last known state obtained from `self.snapshot`
+
+        Returns
+        -------
+        dict
+            state of watched files after changes settled
+        """
+        current = state
+        while current == state:
+            time.sleep(self.interval)
+            current = self.snapshot()
+        settled = None
+        while settled != current:
+            settled = current
+            time.sleep(self.delay)
+            current = self.snapshot()
+        return current
+
+    def is_output(self, path):
+        """Check if path leads to directory with `html` notes or inside it."""
+        return path == self.output or self.output in path.parents
+
+    def merge(self, state):
+        """Return state of files watched after build keeping known ones.
+
+        Files watched before build keep state taken then, so their changes
+        made during build start next one. Files found by build, e.g. new
+        notes, get their current state.
+
+        Parameters
+        ----------
+        state : dict
+            state of watched files taken before build
+
+        Returns
+        -------
+        dict
+            state of files watched after build
+        """
+        return {path: state.get(path, current)
+                for path, current in self.snapshot().items()}
+
+    def build(self):
+        """Create `html` notes and report result."""
+        start = time.perf_counter()
+        try:
+            mdnotes.main(self.path, converter=self.converter, **self.options)
+            self.dependencies = mdnotes.Manifest(self.output).dependencies
+            for path in self.converter.scanned:
+                if self.is_output(path):
+                    state = mdnotes.Preprocessing.state(path)
+                    self.converter.scanned[path] = state
+        except Exception as error:
+            print(f'Build failed: {error}', flush=True)
+        else:
+            elapsed = time.perf_counter() - start
+            print(f'Notes created in {elapsed:.2f}s', flush=True)
+
+    def run(self):
+        """Create notes then create them again after every change."""
+        state = self.snapshot()
+        self.build()
+        state = self.merge(state)
+        print(f'Watching "{self.path}" for changes, press Ctrl+C to stop',
+              flush=True)
+        try:
+            while True:
+                state = self.wait(state)
+                self.build()
+                state = self.merge(state)
+        except KeyboardInterrupt:
+            pass
+
+
+def main(path, *args, **kwargs):
+    """Create `Watcher` for set path and run it.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        path to directory with notes
+    *args
+        optional arguments passed to `Watcher` class
+    **kwargs
+        optional keyword arguments passed to `Watcher` class
+    """
+    Watcher(path, *args, **kwargs).run()
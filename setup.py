@@ -1,4 +1,6 @@
+from pathlib import Path
 from setuptools import setup
+from setuptools.command.build_py import build_py
 from sys import platform
 
 from pdoc3_mdnotes import __version__
@@ -14,6 +16,23 @@ def get_requirements():
         return required.read()
 
 
+class BuildPy(build_py):
+    """Build package then precompile its templates when `mako` is present."""
+
+    def run(self):
+        super().run()
+        try:
+            from mako.lookup import TemplateLookup
+        except ImportError:
+            return
+        templates = Path(self.build_lib, 'pdoc3_mdnotes', 'templates')
+        lookup = TemplateLookup(directories=[str(templates)],
+                                module_directory=str(templates / 'compiled'),
+                                input_encoding='utf-8')
+        for path in templates.glob('*.mako'):
+            lookup.get_template('/' + path.name)
+
+
 data_files = []
 if platform == 'linux':
     data_files.append(('share/applications', ['data/mdnotes.desktop']))
@@ -30,7 +49,7 @@ setup(
     license='MIT/AGPLv3+',
     platforms=['any'],
     install_requires=get_requirements(),
-    python_requires='>=3.6',
+    python_requires='>=3.9',
     classifiers=['Development Status :: 5 - Production/Stable',
                  'Intended Audience :: End Users/Desktop',
                  'License :: OSI Approved :: '
@@ -46,6 +65,7 @@ setup(
                  ],
     packages=['pdoc3_mdnotes'],
     data_files=data_files,
+    cmdclass={'build_py': BuildPy},
     include_package_data=True,
     entry_points={
         'console_scripts': [
@@ -0,0 +1,13 @@
+"""Fixtures shared by all tests."""
+
+import pytest
+
+from pdoc3_mdnotes import mdnotes
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    """Keep compiled templates and preprocessor results in temporary place."""
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(mdnotes, "CACHE", directory)
+    return directory
@@ -0,0 +1,85 @@
+"""Tests of rendered pages stored by `pdoc3_mdnotes.mdnotes.Cache`."""
+
+import os
+import warnings
+
+import pytest
+
+from pdoc3_mdnotes import mdnotes
+
+
+def keys(root, templates="templates"):
+    """Return name of each note in set directory mapped to its cache key."""
+    notes = mdnotes.Notes(mdnotes.Converter(root))
+    return {module.name: mdnotes.Cache.key(module, templates)
+            for module in notes.walk(notes.module)}
+
+
+@pytest.fixture
+def notes(tmp_path):
+    """Create directory with two notes."""
+    root = tmp_path / "notes"
+    root.mkdir()
+    (root / "first.md").write_text("# First\n\nSee `notes.second`.\n")
+    (root / "second.md").write_text("# Second\n")
+    return root
+
+
+def test_key_is_stable(notes):
+    assert keys(notes) == keys(notes)
+
+
+def test_key_changes_with_content(notes):
+    before = keys(notes)
+    (notes / "second.md").write_text("# Second\n\nChanged.\n")
+    after = keys(notes)
+    assert before["notes.first"] == after["notes.first"]
+    assert before["notes.second"] != after["notes.second"]
+
+
+def test_key_changes_with_templates(notes):
+    before, after = keys(notes), keys(notes, "other")
+    assert all(before[name] != after[name] for name in before)
+
+
+def test_key_changes_with_added_note(notes):
+    before = keys(notes)
+    (notes / "third.md").write_text("# Third\n")
+    after = keys(notes)
+    assert before["notes"] != after["notes"]
+    assert before["notes.first"] == after["notes.first"]
+
+
+def test_stored_page_is_returned(tmp_path):
+    cache = mdnotes.Cache(tmp_path / "pages")
+    assert cache.get("abcdef") is None
+    cache.put("abcdef", "page")
+    assert cache.get("abcdef") == "page"
+    assert (cache.hits, cache.misses, cache.errors) == (1, 1, 0)
+    assert cache.locate("abcdef") == tmp_path / "pages" / "ab" / "abcdef"
+
+
+def test_prune_removes_least_recently_used(tmp_path):
+    cache = mdnotes.Cache(tmp_path / "pages", size=20)
+    for age, key in enumerate(["aa1", "aa2", "bb3"]):
+        cache.put(key, "0123456789")
+        os.utime(cache.locate(key), (1000 - age, 1000 - age))
+    cache.get("bb3")
+    cache.prune()
+    assert cache.evictions == 1
+    assert cache.get("aa1") == "0123456789"
+    assert cache.get("aa2") is None
+    assert cache.get("bb3") == "0123456789"
+
+
+def test_failed_put_warns_once(tmp_path):
+    path = tmp_path / "pages"
+    path.write_text("not directory")
+    cache = mdnotes.Cache(path)
+    with pytest.warns(UserWarning, match="Cannot store page in cache"):
+        cache.put("abcdef", "page")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        cache.put("abcdef", "page")
+    assert cache.errors == 2
+    assert cache.get("abcdef") is None
@@ -0,0 +1,129 @@
+"""Tests of pages invalidation by `pdoc3_mdnotes.mdnotes.Manifest`."""
+
+import json
+
+import pytest
+
+from pdoc3_mdnotes import mdnotes
+
+
+def update(root):
+    """Return manifest of previous build and pages it creates again."""
+    converter = mdnotes.Converter(root)
+    notes = mdnotes.Notes(converter)
+    manifest = mdnotes.Manifest(root / "docs")
+    return manifest, manifest.update(converter, notes)
+
+
+@pytest.fixture
+def notes(tmp_path):
+    """Create notes with one directory and build them."""
+    root = tmp_path / "notes"
+    (root / "topic").mkdir(parents=True)
+    (root / "README.md").write_text("# Notes\n\nRoot page.\n")
+    (root / "first.md").write_text("# First\n\nFirst note.\n")
+    (root / "topic" / "README.md").write_text("# Topic\n\nTopic page.\n")
+    (root / "topic" / "second.md").write_text("# Second\n\nSecond note.\n")
+    mdnotes.main(root)
+    return root
+
+
+def test_first_build_explains_missing_manifest(tmp_path):
+    root = tmp_path / "notes"
+    root.mkdir()
+    (root / "note.md").write_text("# Note\n")
+    manifest, names = update(root)
+    assert names is None
+    assert manifest.reasons == {
+        "notes": ["no previous build manifest"],
+        "notes.note": ["no previous build manifest"]}
+
+
+def test_nothing_changed(notes):
+    manifest, names = update(notes)
+    assert names == set()
+    assert manifest.removed == []
+
+
+def test_content_change_keeps_parent(notes):
+    (notes / "topic" / "second.md").write_text("# Second\n\nChanged.\n")
+    manifest, names = update(notes)
+    assert names == {"notes.topic.second"}
+    assert manifest.reasons == {"notes.topic.second": ["content changed"]}
+
+
+def test_added_note_creates_parent(notes):
+    (notes / "topic" / "third.md").write_text("# Third\n")
+    manifest, names = update(notes)
+    assert names == {"notes.topic", "notes.topic.third"}
+    assert manifest.reasons["notes.topic"] == ["notes.topic.third added"]
+    assert manifest.reasons["notes.topic.third"] == ["new note"]
+
+
+def test_removed_note_creates_parent(notes):
+    (notes / "topic" / "second.md").unlink()
+    manifest, names = update(notes)
+    assert names == {"notes.topic"}
+    assert manifest.reasons["notes.topic"] == ["notes.topic.second removed"]
+    assert manifest.removed == ["topic/second.html"]
+
+
+def test_renamed_note_creates_parent(notes):
+    (notes / "first.md").rename(notes / "renamed.md")
+    manifest, names = update(notes)
+    assert names == {"notes", "notes.renamed"}
+    assert manifest.reasons["notes"] == ["notes.first removed",
+                                         "notes.renamed added"]
+    assert manifest.removed == ["first.html"]
+
+
+def test_changed_templates_create_all_pages(notes):
+    path = notes / "docs" / mdnotes.Manifest.NAME
+    data = json.loads(path.read_text())
+    data["templates"] = "outdated"
+    path.write_text(json.dumps(data))
+    manifest, names = update(notes)
+    assert names is None
+    assert set(manifest.reasons) == set(manifest.notes)
+    assert {r for reasons in manifest.reasons.values()
+            for r in reasons} == {"templates changed"}
+
+
+def test_missing_page_is_created(notes):
+    (notes / "docs" / "first.html").unlink()
+    manifest, names = update(notes)
+    assert names == {"notes.first"}
+    assert manifest.reasons == {"notes.first": ["page missing"]}
+
+
+def test_clean_deletes_pages_removed_in_earlier_build(notes):
+    (notes / "first.md").unlink()
+    mdnotes.main(notes)
+    assert (notes / "docs" / "first.html").exists()
+    assert mdnotes.Manifest(notes / "docs").removed == ["first.html"]
+    mdnotes.main(notes, clean=True)
+    assert not (notes / "docs" / "first.html").exists()
+    assert mdnotes.Manifest(notes / "docs").removed == []
+
+
+def test_readded_note_is_not_removed(notes):
+    content = (notes / "first.md").read_text()
+    (notes / "first.md").unlink()
+    mdnotes.main(notes)
+    (notes / "first.md").write_text(content)
+    mdnotes.main(notes, clean=True)
+    assert (notes / "docs" / "first.html").exists()
+    assert mdnotes.Manifest(notes / "docs").removed == []
+
+
+def test_included_file_change_creates_note(notes):
+    (notes / "part.txt").write_text("Included part.\n")
+    (notes / "first.md").write_text("# First\n\n.. include:: part.txt\n")
+    mdnotes.main(notes)
+    assert "Included part." in (notes / "docs" / "first.html").read_text()
+    (notes / "part.txt").write_text("Changed part.\n")
+    manifest, names = update(notes)
+    assert names == {"notes.first"}
+    assert manifest.reasons == {"notes.first": ["content changed"]}
+    mdnotes.main(notes)
+    assert "Changed part." in (notes / "docs" / "first.html").read_text()
@@ -0,0 +1,109 @@
+"""Tests of writing created pages to files, directories and archives."""
+
+import os
+
+import pytest
+
+from pdoc3_mdnotes import mdnotes
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """Create directory with one page."""
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    (directory / "index.html").write_text("index")
+    return directory
+
+
+def test_staged_directory_replaces_original(docs):
+    with mdnotes.staged(docs) as staging:
+        assert staging.parent == docs.parent
+        assert (staging / "index.html").stat().st_ino == \
+            (docs / "index.html").stat().st_ino
+        mdnotes.write(staging / "index.html", "changed")
+        mdnotes.write(staging / "note.html", "note")
+        assert (docs / "index.html").read_text() == "index"
+        assert not (docs / "note.html").exists()
+    assert not docs.is_symlink()
+    assert (docs / "index.html").read_text() == "changed"
+    assert (docs / "note.html").read_text() == "note"
+    assert os.listdir(docs.parent) == ["docs"]
+
+
+def test_staged_directory_is_removed_on_error(docs):
+    with pytest.raises(RuntimeError):
+        with mdnotes.staged(docs) as staging:
+            mdnotes.write(staging / "index.html", "changed")
+            raise RuntimeError
+    assert (docs / "index.html").read_text() == "index"
+    assert os.listdir(docs.parent) == ["docs"]
+
+
+def test_staged_directory_creates_missing_one(tmp_path):
+    docs = tmp_path / "docs"
+    with mdnotes.staged(docs) as staging:
+        mdnotes.write(staging / "index.html", "index")
+    assert (docs / "index.html").read_text() == "index"
+    assert os.listdir(tmp_path) == ["docs"]
+
+
+def test_write_skips_unchanged_content(docs):
+    path = docs / "index.html"
+    assert mdnotes.write(path, "index") == 0
+    assert mdnotes.write(path, [b"in", b"dex"]) == 0
+    assert mdnotes.write(path, "changed") == 7
+    assert mdnotes.write(path, [b"chunk", b"s"]) == 6
+    assert path.read_text() == "chunks"
+
+
+def test_write_removes_temporary_file_on_error(docs):
+    def chunks():
+        yield b"partial"
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        mdnotes.write(docs / "index.html", chunks())
+    assert (docs / "index.html").read_text() == "index"
+    assert os.listdir(docs) == ["index.html"]
+
+
+@pytest.mark.parametrize("name", ["docs.zip", "docs.tar", "docs.tar.gz",
+                                  "docs.tgz", "docs.tar.xz"])
+def test_archive_contains_pages(tmp_path, name):
+    import tarfile
+    import zipfile
+
+    path = tmp_path / name
+    with mdnotes.archive(path) as output:
+        send = mdnotes.receiver(output)
+        send("index.html", "index")
+        send("topic/note.html", iter([b"no", b"te"]))
+    assert os.listdir(tmp_path) == [name]
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as result:
+            pages = {i.filename: (result.read(i), i.external_attr >> 16)
+                     for i in result.infolist()}
+    else:
+        with tarfile.open(path) as result:
+            pages = {i.name: (result.extractfile(i).read(), i.mode)
+                     for i in result.getmembers()}
+    assert pages == {"index.html": (b"index", 0o644),
+                     "topic/note.html": (b"note", 0o644)}
+
+
+def test_archive_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported archive format"):
+        with mdnotes.archive(tmp_path / "docs.rar"):
+            pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_archive_is_not_created_on_error(tmp_path):
+    (tmp_path / "docs.zip").write_text("previous")
+    with pytest.raises(RuntimeError):
+        with mdnotes.archive(tmp_path / "docs.zip") as output:
+            mdnotes.receiver(output)("index.html", "index")
+            raise RuntimeError
+    assert os.listdir(tmp_path) == ["docs.zip"]
+    assert (tmp_path / "docs.zip").read_text() == "previous"
@@ -0,0 +1,142 @@
+"""Tests of preprocessors and cache of their results."""
+
+import pytest
+
+from pdoc3_mdnotes import mdnotes
+
+SOURCE = '''import functools
+
+
+@functools.lru_cache()
+@functools.wraps(print)
+def decorated(value):
+    return value
+# comment at column 0 inside of nothing
+
+
+class Shape:
+    """Shape."""
+
+    def area(self):
+
+        # comment in method
+        return 0
+# trailing comment
+
+
+def last():
+    pass
+'''
+
+
+@pytest.fixture
+def notes(tmp_path):
+    """Create directory with Python file and files to include."""
+    root = tmp_path / "notes"
+    (root / "parts").mkdir(parents=True)
+    (root / "code.py").write_text(SOURCE)
+    (root / "parts" / "outer.md").write_text("Outer {!include inner.md!}")
+    (root / "parts" / "inner.md").write_text("inner.")
+    return root
+
+
+def code(root, part):
+    """Return lines of code block with selected part of `code.py`."""
+    content, used = mdnotes.Code().process(f"{{!code code.py:{part}!}}",
+                                           root / "note.md")
+    assert used == [root / "code.py"]
+    return content.splitlines()[1:-1]
+
+
+def test_code_selects_line_range(notes):
+    assert code(notes, "4-6") == SOURCE.splitlines()[3:6]
+
+
+def test_code_selects_function_with_decorators(notes):
+    assert code(notes, "decorated") == ["@functools.lru_cache()",
+                                        "@functools.wraps(print)",
+                                        "def decorated(value):",
+                                        "    return value"]
+
+
+def test_code_selects_class_without_trailing_comment(notes):
+    lines = code(notes, "Shape")
+    assert lines[0] == "class Shape:"
+    assert lines[-1] == "        return 0"
+    assert "        # comment in method" in lines
+
+
+def test_code_selects_last_definition(notes):
+    assert code(notes, "last") == ["def last():", "    pass"]
+
+
+def test_code_reports_missing_part(notes):
+    with pytest.raises(ValueError, match="missing not found"):
+        code(notes, "missing")
+
+
+def test_code_block_has_language_and_longer_fence(notes):
+    (notes / "fenced.md").write_text("```\nblock\n```\n")
+    content, _ = mdnotes.Code().process("{!code fenced.md!}",
+                                        notes / "note.md")
+    assert content == "````md\n```\nblock\n```\n````"
+
+
+def test_include_is_nested(notes):
+    content, used = mdnotes.Include().process("{!include parts/outer.md!}",
+                                              notes / "note.md")
+    assert content == "Outer inner."
+    assert used == [notes / "parts" / "outer.md",
+                    notes / "parts" / "inner.md"]
+
+
+def test_include_reports_recursion(notes):
+    (notes / "self.md").write_text("{!include self.md!}")
+    with pytest.raises(ValueError, match="nested too deep"):
+        mdnotes.Include().process("{!include self.md!}", notes / "note.md")
+
+
+def test_variables_are_substituted(notes):
+    variables = mdnotes.Variables({"name": "value"})
+    content, used = variables.process("{{ name }} {{unknown}}",
+                                      notes / "note.md")
+    assert content == "value {{unknown}}"
+    assert used == []
+    assert variables.key() != mdnotes.Variables({"name": "other"}).key()
+
+
+def test_cached_result_is_reused(notes, tmp_path):
+    preprocessing = mdnotes.Preprocessing(
+        [mdnotes.Include(), mdnotes.Variables({"who": "me"})],
+        tmp_path / "cache")
+    path = notes / "note.md"
+    note = "{!include parts/outer.md!} {{ who }}"
+    expected = ("Outer inner. me", {notes / "parts" / "outer.md",
+                                     notes / "parts" / "inner.md"})
+    assert preprocessing.run(note, path) == expected
+    assert preprocessing.cache.misses == 1
+    assert preprocessing.run(note, path) == expected
+    assert preprocessing.cache.hits == 1
+    assert preprocessing.cache.misses == 1
+
+
+def test_changed_dependency_invalidates_result(notes, tmp_path):
+    preprocessing = mdnotes.Preprocessing([mdnotes.Include()],
+                                          tmp_path / "cache")
+    path = notes / "note.md"
+    note = "{!include parts/outer.md!}"
+    assert preprocessing.run(note, path)[0] == "Outer inner."
+    (notes / "parts" / "inner.md").write_text("changed inner.")
+    assert preprocessing.run(note, path)[0] == "Outer changed inner."
+    (notes / "parts" / "inner.md").unlink()
+    with pytest.raises(ValueError, match="cannot include"):
+        preprocessing.run(note, path)
+
+
+def test_preprocessing_without_cache(notes):
+    preprocessing = mdnotes.Preprocessing([mdnotes.Code()], None)
+    content, used = preprocessing.run("{!code code.py:last!}",
+                                      notes / "note.md")
+    assert content == "```py\ndef last():\n    pass\n```"
+    assert used == {notes / "code.py"}
+    assert preprocessing.cache is None